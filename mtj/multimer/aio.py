@@ -0,0 +1,190 @@
+"""
+asyncio front end for the tracker.
+
+Requires Python 3.
+"""
+
+import asyncio
+
+from mtj.multimer.clock import now
+from mtj.multimer.ingest import Reconciler
+from mtj.multimer.tracker import Tracker
+
+
+class AsyncTracker(object):
+    """
+    Drives a `Tracker` from a single asyncio task, which sleeps until
+    the next predicted event rather than polling the buffers.
+
+    Events can be awaited individually through `waitFor`, or consumed
+    as they happen by iterating over `events`.
+    """
+
+    def __init__(self, tracker=None, clock=None, sleep=None):
+        """
+        tracker - the tracker to drive.  Default: a new `Tracker`.
+        clock - a callable returning the current timestamp.
+                Default: `mtj.multimer.clock.now`
+        sleep - a coroutine function to sleep for a number of seconds.
+                Default: `asyncio.sleep`
+        """
+
+        if tracker is None:
+            tracker = Tracker()
+
+        self.tracker = tracker
+        self.clock = clock or now
+        self.sleep = sleep or asyncio.sleep
+
+        self._waiters = []
+        self._queues = []
+        self._changed = None
+        self._running = False
+
+    def _wake(self):
+        if self._changed is not None:
+            self._changed.set()
+
+    def add(self, key, buffer):
+        self.tracker.add(key, buffer)
+        self._wake()
+
+    def remove(self, key):
+        buffer = self.tracker.remove(key)
+        self._wake()
+        return buffer
+
+    def update(self, key, buffer):
+        self.tracker.update(key, buffer)
+        self._wake()
+
+    def _dispatch(self, event):
+        waiters = []
+        for waiter in self._waiters:
+            key, kind, future = waiter
+            if future.done():
+                continue
+            if key == event.key and kind in (None, event.kind):
+                future.set_result(event)
+            else:
+                waiters.append(waiter)
+        self._waiters = waiters
+
+        for queue in self._queues:
+            queue.put_nowait(event)
+
+    async def waitFor(self, key, kind=None):
+        """
+        Wait for the next event of kind (any kind if unspecified) for
+        the buffer tracked under key, and return it.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((key, kind, future))
+        return await future
+
+    def events(self):
+        """
+        Return an `EventStream` to asynchronously iterate over every
+        event from now on.
+        """
+
+        return EventStream(self)
+
+    async def reconcile(self, observations, reconciler=None):
+        """
+        Reconcile the observations from an asynchronous iterable against
+        the tracked buffers, dispatching and generating the 'observed'
+        events of those that changed a buffer.
+
+        reconciler - the `Reconciler` to use.  Default: a new one for
+                     the tracker.
+        """
+
+        if reconciler is None:
+            reconciler = Reconciler(self.tracker)
+        async for timestamp, key, value in observations:
+            event = reconciler.reconcile(key, value, timestamp)
+            if event is None:
+                continue
+            self._wake()
+            self._dispatch(event)
+            yield event
+
+    def popDue(self):
+        """
+        Dispatch the events that are due according to the clock.
+        """
+
+        events = self.tracker.popDue(self.clock())
+        for event in events:
+            self._dispatch(event)
+        return events
+
+    async def _idle(self, delay):
+        changed = asyncio.ensure_future(self._changed.wait())
+        waiting = [changed]
+        if delay is not None:
+            waiting.append(asyncio.ensure_future(self.sleep(delay)))
+        done, pending = await asyncio.wait(
+            waiting, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+
+    async def run(self):
+        """
+        Dispatch events as they come due until `stop` is called.
+        """
+
+        self._changed = asyncio.Event()
+        self._running = True
+        while self._running:
+            self._changed.clear()
+            self.popDue()
+            upcoming = self.tracker.peekNext()
+            if upcoming is None:
+                await self._idle(None)
+                continue
+            delay = upcoming[0] - self.clock()
+            if delay > 0:
+                await self._idle(delay)
+            else:
+                # let everything else have a turn.
+                await asyncio.sleep(0)
+
+    def stop(self):
+        self._running = False
+        self._wake()
+
+
+class EventStream(object):
+    """
+    An asynchronous iterator over the events dispatched by an
+    `AsyncTracker` since this was created, including those dispatched
+    before iterating starts.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.queue = asyncio.Queue()
+        tracker._queues.append(self.queue)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.queue is None:
+            raise StopAsyncIteration
+        return await self.queue.get()
+
+    def close(self):
+        """
+        Stop receiving events.
+        """
+
+        if self.queue is not None:
+            self.tracker._queues.remove(self.queue)
+            self.queue = None
+
+    async def aclose(self):
+        self.close()
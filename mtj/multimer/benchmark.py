@@ -0,0 +1,299 @@
+"""
+Benchmarks for the timer machinery.
+
+Run with `python -m mtj.multimer.benchmark`; results are written to
+standard output as JSON, as the best wall time in seconds of each
+benchmark.  Results saved with --save can be given as --baseline to a
+later run, which then also reports the ratio of every time to the
+baseline and exits with status 1 if any are slower than allowed.
+"""
+
+import argparse
+import json
+import random
+import sys
+from timeit import default_timer as timer
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.scheduler import schedulers
+from mtj.multimer.tests import qLPos
+
+
+def measure(f, setup=None, repeat=3):
+    """
+    Return the best wall time in seconds out of repeat calls to f.
+
+    If setup is specified, it is called (untimed) before every call to
+    f and its result is passed to f.
+    """
+
+    best = None
+    for i in range(repeat):
+        args = ()
+        if setup is not None:
+            args = (setup(),)
+        start = timer()
+        f(*args)
+        elapsed = timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchSchedulers(size=100000, period=3600, seed=0):
+    """
+    Compare the schedulers with size keys with clustered timestamps,
+    as buffers that share the same period end up with.
+    """
+
+    rng = random.Random(seed)
+    start = 1350000000
+    timestamps = [start + rng.randrange(60) + period * rng.randrange(720)
+        for i in range(size)]
+    cancelled = rng.sample(range(size), size // 10)
+
+    def push(scheduler):
+        for key, timestamp in enumerate(timestamps):
+            scheduler.push(key, timestamp)
+        return scheduler
+
+    def cancel(scheduler):
+        for key in cancelled:
+            scheduler.cancel(key)
+
+    def advance(scheduler):
+        timestamp = start
+        while scheduler.peek() is not None:
+            timestamp += period
+            scheduler.popDue(timestamp)
+
+    results = {}
+    for name in sorted(schedulers):
+        factory = schedulers[name]
+        filled = lambda: push(factory())
+        results[name] = {
+            'push': measure(push, factory),
+            'cancel': measure(cancel, filled),
+            'advance': measure(advance, filled),
+        }
+
+    return results
+
+
+def benchGetCurrent(calls=10000):
+    """
+    Time calls to getCurrent on the same buffer at increasing times.
+    """
+
+    buffer = qLPos(28000)
+
+    def run():
+        for timestamp in range(0, calls * 60, 60):
+            buffer.getCurrent(timestamp)
+
+    return measure(run)
+
+
+def benchChain(length=10000):
+    """
+    Time a chain of getCurrent calls, each on the result of the last,
+    one cycle apart.
+    """
+
+    def run():
+        buffer = qLPos(28000)
+        for i in range(length):
+            buffer = buffer.getCurrent(buffer.expiry + 1)
+
+    return measure(run)
+
+
+def makePredicates(count):
+    """
+    Return a subclass of `TimedBuffer` with count additional freeze
+    predicates that never freeze.
+    """
+
+    attrs = dict(('freeze_Never%d' % i, lambda self, timestamp: False)
+        for i in range(count))
+    return type('Predicates%d' % count, (TimedBuffer,), attrs)
+
+
+def makeAttributes(count):
+    """
+    Return a subclass of `TimedBuffer` with count additional class
+    attributes that are not freeze predicates.
+    """
+
+    attrs = dict(('attribute%d' % i, i) for i in range(count))
+    return type('Attributes%d' % count, (TimedBuffer,), attrs)
+
+
+def benchPredicates(counts=(0, 10, 100), calls=10000):
+    """
+    Time calls to isToBeFrozen with count additional predicates.
+    """
+
+    results = {}
+    for count in counts:
+        buffer = makePredicates(count)(delta=40, period=3600, timestamp=0,
+            delta_min=1, delta_factor=-1, value=28000, full=28000)
+
+        def run():
+            for timestamp in range(0, calls * 60, 60):
+                buffer.isToBeFrozen(timestamp)
+
+        results[str(count)] = measure(run)
+    return results
+
+
+def benchAttributes(counts=(0, 100, 1000), calls=10000):
+    """
+    Time calls to getCurrent on a subclass with count additional class
+    attributes, which the freeze predicates are looked up among.
+    """
+
+    results = {}
+    for count in counts:
+        cls = makeAttributes(count)
+
+        def run():
+            buffer = cls(delta=40, period=3600, timestamp=0, delta_min=1,
+                delta_factor=-1, value=28000, full=28000)
+            for timestamp in range(0, calls * 60, 60):
+                buffer.getCurrent(timestamp)
+
+        results[str(count)] = measure(run)
+    return results
+
+
+def benchBulk(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6), seed=0):
+    """
+    Time getCurrent on `TimedBufferArray` of each of the sizes, with
+    randomized values.  Requires numpy.
+    """
+
+    from mtj.multimer.columnar import TimedBufferArray
+
+    rng = numpy.random.RandomState(seed)
+    results = {}
+    for size in sizes:
+        array = TimedBufferArray(
+            full=numpy.full(size, 28000),
+            value=rng.randint(0, 28001, size),
+            empty=numpy.zeros(size, dtype=int),
+            delta=numpy.full(size, 40),
+            period=numpy.full(size, 3600),
+            timestamp=numpy.zeros(size, dtype=int),
+            expiry=numpy.full(size, 3599),
+            delta_min=numpy.ones(size),
+            delta_factor=numpy.full(size, -1),
+            freeze=numpy.zeros(size, dtype=bool),
+        )
+        results[str(size)] = measure(lambda: array.getCurrent(86400))
+    return results
+
+
+def flatten(results, prefix=''):
+    """
+    Return the nested results as a dict of dotted names to times.
+    """
+
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + name + '.'))
+        else:
+            flat[prefix + name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare the results with the baseline results, returning a dict of
+    the dotted names found in both to the ratio of the time to the
+    baseline, and a sorted list of the names slower than the baseline
+    by more than the tolerance.
+    """
+
+    results = flatten(results)
+    baseline = flatten(baseline)
+    ratios = {}
+    for name in results:
+        if baseline.get(name):
+            ratios[name] = results[name] / baseline[name]
+    regressions = sorted(name for name, ratio in ratios.items()
+        if ratio > 1 + tolerance)
+    return ratios, regressions
+
+
+benchmarks = {
+    'schedulers': lambda args: benchSchedulers(size=args.size),
+    'getCurrent': lambda args: benchGetCurrent(calls=args.calls),
+    'chain': lambda args: benchChain(length=args.calls),
+    'predicates': lambda args: benchPredicates(calls=args.calls),
+    'attributes': lambda args: benchAttributes(calls=args.calls),
+    'bulk': lambda args: benchBulk(sizes=[10 ** n for n in range(3,
+        args.bulk_max + 1)]),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--size', type=int, default=100000,
+        help='number of timers to benchmark the schedulers with')
+    parser.add_argument('--calls', type=int, default=10000,
+        help='number of calls for the single buffer benchmarks')
+    parser.add_argument('--bulk-max', type=int, default=6,
+        help='largest array size for the bulk benchmark, as a power of '
+            'ten (7 requires a few gigabytes of memory)')
+    parser.add_argument('--bench', action='append',
+        choices=sorted(benchmarks),
+        help='benchmark to run, can be repeated.  Default: all')
+    parser.add_argument('--save', metavar='FILE',
+        help='save the results to FILE as a baseline')
+    parser.add_argument('--baseline', metavar='FILE',
+        help='compare the results with the baseline saved in FILE')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+        help='fraction slower than the baseline that is a regression')
+    args = parser.parse_args(argv)
+
+    names = args.bench or sorted(benchmarks)
+    if numpy is None and 'bulk' in names:
+        if args.bench:
+            parser.error('the bulk benchmark requires numpy')
+        names.remove('bulk')
+
+    results = {}
+    for name in names:
+        results[name] = benchmarks[name](args)
+
+    if args.save:
+        with open(args.save, 'w') as fd:
+            json.dump(results, fd, indent=2, sort_keys=True)
+
+    output = results
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as fd:
+            baseline = json.load(fd)
+        ratios, regressions = compare(results, baseline, args.tolerance)
+        output = {
+            'results': results,
+            'ratios': ratios,
+            'regressions': regressions,
+        }
+        status = 1 if regressions else 0
+
+    json.dump(output, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
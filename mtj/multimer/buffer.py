@@ -1,6 +1,33 @@
-import time
+from collections import namedtuple
 from math import ceil
 
+from mtj.multimer.clock import now
+
+
+TimedBufferState = namedtuple('TimedBufferState', ['full', 'value', 'empty',
+    'delta', 'period', 'timestamp', 'expiry', 'delta_min', 'delta_factor',
+    'freeze'])
+
+
+def freezePredicate(order=0):
+    """
+    Mark a method of a subclass of `TimedBuffer` as a freeze predicate,
+    regardless of its name.
+
+    Predicates are evaluated in ascending order (ties are broken by
+    name) and evaluation stops at the first one that returns True, so
+    cheap predicates should be given a lower order than expensive
+    ones.  Methods starting with the freeze prefix are registered with
+    an order of 0 unless decorated.  Decorated methods of `TimedBuffer`
+    itself are still subject to the prefix, so subclasses using another
+    prefix do not inherit them.
+    """
+
+    def decorate(f):
+        f.freezeOrder = order
+        return f
+    return decorate
+
 
 class Buffer(object):
     """
@@ -8,6 +35,8 @@ class Buffer(object):
     lower limit defined by `empty`.
     """
 
+    __slots__ = ('full', 'value', 'empty')
+
     def __init__(self, full=100, value=0, empty=0):
         assert empty < full
         assert empty <= value <= full
@@ -33,6 +62,18 @@ class Buffer(object):
             empty=self.empty,
             *a, **kw)
 
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                state[name] = getattr(self, name)
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
 
 class TimedBuffer(Buffer):
     """
@@ -42,6 +83,11 @@ class TimedBuffer(Buffer):
     period of which this buffer changes, and the delta to apply.
     """
 
+    __slots__ = ('delta', 'period', 'timestamp', 'expiry', 'delta_min',
+        'delta_factor', 'freeze')
+
+    freezePrefix = 'freeze'
+
     def __init__(self, delta=1, period=60, timestamp=None, expiry=None,
             delta_min=0, delta_factor=1, freeze=False, *a, **kw):
         """
@@ -66,7 +112,7 @@ class TimedBuffer(Buffer):
 
         if timestamp is None:
             # use current time.
-            timestamp = int(time.time())
+            timestamp = now()
 
         if expiry is None:
             expiry = timestamp + period - 1
@@ -79,26 +125,100 @@ class TimedBuffer(Buffer):
         self.delta_factor = delta_factor
         self.freeze = freeze
 
-        self.freezePrefix = 'freeze'
-
         super(TimedBuffer, self).__init__(*a, **kw)
 
+    @classmethod
+    def fromState(cls, state):
+        """
+        Create a buffer from a `TimedBufferState` (or any sequence of
+        values in the same order) without validating it, so it must
+        only be used with states that came from a valid buffer.
+        """
+
+        self = object.__new__(cls)
+        (self.full, self.value, self.empty, self.delta, self.period,
+            self.timestamp, self.expiry, self.delta_min, self.delta_factor,
+            self.freeze) = state
+        return self
+
+    def getState(self):
+        """
+        Return the state of this buffer as a `TimedBufferState`.
+        """
+
+        return TimedBufferState(self.full, self.value, self.empty,
+            self.delta, self.period, self.timestamp, self.expiry,
+            self.delta_min, self.delta_factor, self.freeze)
+
+    @classmethod
+    def _hasPlainInit(cls):
+        # Whether the constructor is the one defined here, such that
+        # derived states can be created through fromState.
+        plain = cls.__dict__.get('_plainInit')
+        if plain is None:
+            mro = cls.__mro__
+            plain = not any('__init__' in klass.__dict__
+                for klass in mro[:mro.index(TimedBuffer)])
+            cls._plainInit = plain
+        return plain
+
+    @classmethod
+    def _getDefiner(cls, name):
+        # The class that defines the attribute name.
+        for klass in cls.__mro__:
+            if name in klass.__dict__:
+                return klass
+
+    @classmethod
+    def getFreezePredicates(cls, prefix=None):
+        """
+        Return the names of the freeze predicates for this class, in
+        the order they are to be evaluated.
+
+        The list is built once per class and prefix, on first use.
+        """
+
+        if prefix is None:
+            prefix = cls.freezePrefix
+
+        # Look in the class itself only so subclasses build their own.
+        registry = cls.__dict__.get('_freezeRegistry')
+        if registry is None:
+            registry = {}
+            cls._freezeRegistry = registry
+
+        names = registry.get(prefix)
+        if names is None:
+            predicates = []
+            for attrname in dir(cls):
+                f = getattr(cls, attrname)
+                if not hasattr(f, '__call__'):
+                    continue
+                order = getattr(f, 'freezeOrder', None)
+                if attrname.startswith(prefix):
+                    if order is None:
+                        order = 0
+                elif order is None or cls._getDefiner(attrname) is \
+                        TimedBuffer:
+                    # only subclasses can opt in other names.
+                    continue
+                predicates.append((order, attrname))
+            names = tuple(attrname for order, attrname in sorted(predicates))
+            registry[prefix] = names
+
+        return names
+
     def isToBeFrozen(self, timestamp=None, freeze=None):
         """
         Return whether the next state will be frozen.
         """
 
-        def isFreezeMethod(attrname, prefix=self.freezePrefix):
-            return attrname.startswith(prefix) and \
-                hasattr(getattr(self, attrname), '__call__')
-        freeze_method_names = filter(isFreezeMethod, dir(self))
-
         if freeze is True:
             # Freeze always wins.
             return freeze
 
         # only calculate if not True.
-        for fname in freeze_method_names:
+        for fname in self.getFreezePredicates(self.freezePrefix):
             f = getattr(self, fname)
             if f(timestamp):
                 return True
@@ -112,7 +232,7 @@ class TimedBuffer(Buffer):
         """
 
         if timestamp is None:
-            timestamp = int(time.time())
+            timestamp = now()
         return max(timestamp - self.expiry, 0)
 
     def getCyclesElapsed(self, timestamp=None):
@@ -142,9 +262,125 @@ class TimedBuffer(Buffer):
         # must be negative to be considered depleted.
         return self.getCyclesRemaining(timestamp) < 0
 
+    def getRemainderValue(self):
+        """
+        Return the part of the remainder that can still be applied in
+        steps of delta_min once all the whole cycles are consumed.
+        """
+
+        if self.delta_factor < 0:
+            remainder = (self.value - self.empty) % self.delta
+        elif self.delta_factor > 0:
+            remainder = (self.full - self.value) % self.delta
+
+        # Must be at least 1.
+        subdelta = max(int(round(self.delta * self.delta_min)), 1)
+        subcycles = remainder // subdelta
+        return subcycles * subdelta
+
+    def getCycleTime(self, cycles):
+        """
+        Return the earliest timestamp at which the number of elapsed
+        cycles reaches cycles (which must be at least 1), or None if
+        frozen as cycles never elapse.
+        """
+
+        if self.freeze:
+            return None
+        return self.expiry + (cycles - 1) * self.period + 1
+
+    def getDepletedTime(self):
+        """
+        Return the earliest timestamp at which the cycles will be
+        depleted, or None if frozen.
+
+        This is also the time the remainder is applied.
+        """
+
+        return self.getCycleTime(self.getCyclesAvailable() + 1)
+
+    def getRemainderTime(self):
+        """
+        Return the timestamp at which the remainder will be applied, or
+        None if there is no remainder to apply.
+        """
+
+        if not self.getRemainderValue():
+            return None
+        return self.getDepletedTime()
+
+    def getLimitTime(self):
+        """
+        Return the timestamp at which the value stops changing, i.e.
+        when the buffer becomes as empty or as full as delta and
+        delta_min allow.  Returns None if frozen.
+        """
+
+        if self.freeze:
+            return None
+        if self.getRemainderValue():
+            return self.getDepletedTime()
+        cycles_available = self.getCyclesAvailable()
+        if cycles_available:
+            return self.getCycleTime(cycles_available)
+        return self.timestamp
+
+    def getFreezeTime(self):
+        """
+        Return the earliest timestamp at which the next state will be
+        frozen.  Only the depletion of cycles is considered as other
+        freeze predicates cannot be predicted.
+        """
+
+        if self.freeze:
+            return self.timestamp
+        return self.getDepletedTime()
+
+    @freezePredicate(order=100)
     def freeze_CyclesDepleted(self, timestamp):
         return self.isCyclesDepleted(timestamp=timestamp)
 
+    def iterSamples(self, timestamps, breakpoints=False):
+        """
+        Generate the value and whether it will be frozen for each of
+        the timestamps (an ascending sequence, such as a range) as
+        timestamp, value, freeze tuples, same as what `getCurrent` for
+        each of them would produce, without creating the states.
+
+        If breakpoints is True, only the first timestamp and those
+        where the value or freeze differs from the previous sample are
+        generated.
+        """
+
+        # freeze predicates other than the depletion of cycles must be
+        # checked for every timestamp.
+        predicates = self.getFreezePredicates(self.freezePrefix)
+        check_freeze = predicates != ('freeze_CyclesDepleted',)
+        depletion_freezes = 'freeze_CyclesDepleted' in predicates
+
+        cycles_available = self.getCyclesAvailable()
+        depleted_value = self.value + (cycles_available * self.delta +
+            self.getRemainderValue()) * self.delta_factor
+
+        previous = None
+        for timestamp in timestamps:
+            cycles_elapsed = self.getCyclesElapsed(timestamp)
+            if cycles_elapsed > cycles_available:
+                value = depleted_value
+                freeze = depletion_freezes or self.freeze
+            else:
+                value = self.value + (
+                    cycles_elapsed * self.delta * self.delta_factor)
+                freeze = self.freeze
+            if check_freeze and not freeze:
+                freeze = self.isToBeFrozen(timestamp)
+
+            if breakpoints:
+                if previous == (value, freeze):
+                    continue
+                previous = (value, freeze)
+            yield timestamp, value, freeze
+
     def getCurrent(self, timestamp=None, freeze=None, *a, **kw):
         """
         Returns a current version of this buffer.
@@ -154,7 +390,7 @@ class TimedBuffer(Buffer):
 
         # Freeze the time for the duration of this method.
         if timestamp is None:
-            timestamp = int(time.time())
+            timestamp = now()
 
         # timestamp need to be fixated onto the initial condition.
 
@@ -175,22 +411,21 @@ class TimedBuffer(Buffer):
         # Figure this out if we are not freezing this.
         freeze = self.isToBeFrozen(timestamp, freeze)
 
-        safe_value = self.value + (cycles_available * self.delta)
-
-        if self.delta_factor < 0:
-            remainder = (self.value - self.empty) % self.delta
-        elif self.delta_factor > 0:
-            remainder = (self.full - self.value) % self.delta
-
-        # Must be at least 1.
-        subdelta = max(int(round(self.delta * self.delta_min)), 1)
-        subcycles = remainder / subdelta
+        subvalue = self.getRemainderValue()
 
         # Only apply subcycles after all available cycles are consumed.
         value = (self.value + (min(cycles_elapsed, cycles_available) * 
-            self.delta + (subcycles * subdelta * int(cycles_depleted))) *
+            self.delta + (subvalue * int(cycles_depleted))) *
             self.delta_factor)
 
+        if not a and not kw and self._hasPlainInit():
+            # Fast path, as the new state is derived from a valid one.
+            if expiry is None:
+                expiry = timestamp + self.period - 1
+            return self.fromState((self.full, value, self.empty,
+                self.delta, self.period, timestamp, expiry, self.delta_min,
+                self.delta_factor, freeze))
+
         try:
             result = super(TimedBuffer, self).getCurrent(
                 delta=self.delta,
@@ -203,7 +438,7 @@ class TimedBuffer(Buffer):
                 freeze=freeze,
                 *a, **kw
             )
-        except AssertionError, e:
+        except AssertionError:
             raise RuntimeError('There are bugs in the buffer implementation.')
 
         return result
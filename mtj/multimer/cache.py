@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+from mtj.multimer.clock import now
+
+
+class CurrentCache(object):
+    """
+    A bounded cache of the results of `TimedBuffer.getCurrent`.
+
+    The state of a buffer only changes when a cycle elapses, so results
+    are keyed by the buffer and the number of elapsed cycles, and every
+    timestamp within the same cycle shares one state.  That state is
+    the one at the earliest timestamp of the cycle, so its timestamp
+    will not be the requested one.  This is only valid for buffers with
+    freeze predicates that depend on the elapsed cycles alone, like the
+    default one.
+
+    The least recently used results are evicted once there are more
+    than size of them.
+    """
+
+    def __init__(self, size=1024):
+        assert size > 0
+
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        self._results.clear()
+
+    def getStats(self):
+        """
+        Return the statistics of this cache as a dict.
+        """
+
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._results),
+            'maxsize': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': lookups and float(self.hits) / lookups,
+        }
+
+    def getCurrent(self, buffer, timestamp=None, freeze=None):
+        """
+        Return the current state of buffer, as `buffer.getCurrent`.
+
+        Explicitly freezing or unfreezing bypasses the cache.
+        """
+
+        if freeze is not None:
+            return buffer.getCurrent(timestamp, freeze)
+
+        if timestamp is None:
+            timestamp = now()
+
+        cycles = buffer.getCyclesElapsed(timestamp)
+        # the buffer is kept with the result so its id cannot be reused
+        # while the result is cached.
+        key = (id(buffer), cycles)
+        entry = self._results.pop(key, None)
+        if entry is not None and entry[0] is buffer:
+            self.hits += 1
+            self._results[key] = entry
+            return entry[1]
+
+        self.misses += 1
+        if cycles:
+            start = buffer.getCycleTime(cycles)
+        else:
+            start = min(buffer.timestamp, buffer.expiry)
+        result = buffer.getCurrent(start)
+        self._results[key] = (buffer, result)
+        while len(self._results) > self.size:
+            self._results.popitem(last=False)
+            self.evictions += 1
+        return result
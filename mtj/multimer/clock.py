@@ -0,0 +1,132 @@
+"""
+The source of the current time, for everything that defaults to it
+when a timestamp is not specified.
+
+The clock is the system clock unless replaced with `setClock`, such as
+by a `FakeClock` for simulations and tests.  The time can also be
+pinned for the current context (the thread, or the asyncio task) with
+`pinned`, so that everything evaluated within sees the same instant and
+the clock is read once.
+"""
+
+import threading
+import time
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    ContextVar = None
+
+
+class SystemClock(object):
+    """
+    The current unix time, in whole seconds.
+    """
+
+    def __call__(self):
+        return int(time.time())
+
+
+class FakeClock(object):
+    """
+    A clock that only moves when told to.
+    """
+
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        """
+        Move the clock forward by seconds, and return the new time.
+        """
+
+        self.now += seconds
+        return self.now
+
+
+_default = SystemClock()
+
+if ContextVar is not None:
+    _pinned = ContextVar('pinned', default=None)
+
+    def _getPinned():
+        return _pinned.get()
+
+    def _setPinned(clock):
+        return _pinned.set(clock)
+
+    def _resetPinned(token):
+        _pinned.reset(token)
+
+else:  # pragma: no cover
+    # without context variables, pin for the thread.
+    _local = threading.local()
+
+    def _getPinned():
+        return getattr(_local, 'clock', None)
+
+    def _setPinned(clock):
+        previous = _getPinned()
+        _local.clock = clock
+        return previous
+
+    def _resetPinned(token):
+        _local.clock = token
+
+
+def getClock():
+    """
+    Return the clock in effect for the current context.
+    """
+
+    return _getPinned() or _default
+
+
+def setClock(clock=None):
+    """
+    Replace the clock for every context with clock, a callable returning
+    the current timestamp, and return the one it replaced.  Default:
+    the system clock.
+    """
+
+    global _default
+    previous = _default
+    _default = clock or SystemClock()
+    return previous
+
+
+def now():
+    """
+    Return the current timestamp according to the clock.
+    """
+
+    return getClock()()
+
+
+class pinned(object):
+    """
+    A context manager that pins the time for the current context to
+    timestamp, or to the time it is entered if unspecified, and
+    returns that timestamp.
+
+    For instance, to evaluate many buffers at the same instant::
+
+        with pinned() as timestamp:
+            values = [buffer.getCurrent().value for buffer in buffers]
+    """
+
+    def __init__(self, timestamp=None):
+        self.timestamp = timestamp
+
+    def __enter__(self):
+        timestamp = self.timestamp
+        if timestamp is None:
+            timestamp = now()
+        self._token = _setPinned(FakeClock(timestamp))
+        return timestamp
+
+    def __exit__(self, *exc_info):
+        _resetPinned(self._token)
@@ -0,0 +1,226 @@
+import sys
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from mtj.multimer.buffer import TimedBuffer, TimedBufferState
+from mtj.multimer.clock import now
+
+
+def _round(a):
+    """
+    Round like the builtin round does on this version of Python.
+    """
+
+    if sys.version_info < (3,):  # pragma: no cover
+        # half away from zero.
+        return numpy.sign(a) * numpy.floor(numpy.abs(a) + 0.5)
+    # half to even.
+    return numpy.rint(a)
+
+
+class TimedBufferArray(object):
+    """
+    A collection of timed buffers stored as columns of arrays.
+
+    Every row is equivalent to a `TimedBuffer`, and every method here
+    evaluates all the rows at once, returning arrays rather than
+    scalars.  Only the freeze condition defined by `TimedBuffer`
+    itself (the depletion of cycles) is evaluated; freeze methods
+    defined by subclasses are not considered.
+    """
+
+    fields = TimedBufferState._fields
+
+    def __init__(self, delta, period, timestamp, expiry, delta_min,
+            delta_factor, freeze, full, value, empty):
+        """
+        All arguments are sequences of equal length, with the same
+        meaning as the arguments of the same name for `TimedBuffer`,
+        except none of them may be omitted.
+        """
+
+        if numpy is None:
+            raise ImportError('numpy is required for TimedBufferArray')
+
+        self.full = numpy.asarray(full)
+        self.value = numpy.asarray(value)
+        self.empty = numpy.asarray(empty)
+        self.delta = numpy.asarray(delta)
+        self.period = numpy.asarray(period)
+        self.timestamp = numpy.asarray(timestamp)
+        self.expiry = numpy.asarray(expiry)
+        self.delta_min = numpy.asarray(delta_min)
+        self.delta_factor = numpy.asarray(delta_factor)
+        self.freeze = numpy.asarray(freeze, dtype=bool)
+
+        size = len(self.value)
+        for name in self.fields:
+            column = getattr(self, name)
+            assert column.shape == (size,), 'bad shape for %s' % name
+
+        assert (self.empty < self.full).all()
+        assert ((self.empty <= self.value) &
+            (self.value <= self.full)).all()
+        assert (self.period > 0).all()
+        assert (self.delta_min >= 0).all()
+        assert ((self.delta_factor == 1) | (self.delta_factor == -1)).all()
+
+        self._prepare()
+
+    def _prepare(self):
+        # Everything here depends only on the state and not time, so
+        # it is calculated once per array.
+        decreasing = self.delta_factor < 0
+        headroom = numpy.where(decreasing,
+            self.value - self.empty, self.full - self.value)
+        self._possible = numpy.trunc(
+            headroom * 1.0 / self.delta).astype(numpy.int64)
+        remainder = headroom % self.delta
+        subdelta = numpy.maximum(
+            _round(self.delta * self.delta_min).astype(numpy.int64), 1)
+        self._subvalue = remainder // subdelta * subdelta
+
+    @classmethod
+    def fromBuffers(cls, buffers):
+        """
+        Construct an array from an iterable of `TimedBuffer`.
+        """
+
+        buffers = list(buffers)
+        return cls(**dict(
+            (name, [getattr(b, name) for b in buffers])
+            for name in cls.fields
+        ))
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, index):
+        """
+        Return the row at index as a `TimedBuffer`.
+        """
+
+        return TimedBuffer.fromState(
+            getattr(self, name)[index].item() for name in self.fields)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _timestamp(self, timestamp):
+        if timestamp is None:
+            timestamp = now()
+        return timestamp
+
+    def getDeltaTime(self, timestamp=None):
+        timestamp = self._timestamp(timestamp)
+        return numpy.maximum(timestamp - self.expiry, 0)
+
+    def getCyclesElapsed(self, timestamp=None):
+        delta_t = self.getDeltaTime(timestamp)
+        elapsed = numpy.ceil(delta_t * 1.0 / self.period)
+        return numpy.where(self.freeze, 0, elapsed.astype(numpy.int64))
+
+    def getCyclesAvailable(self):
+        return numpy.where(self.freeze, 0, self._possible)
+
+    def getCyclesPossible(self):
+        return self._possible.copy()
+
+    def getCyclesRemaining(self, timestamp=None):
+        return self.getCyclesAvailable() - self.getCyclesElapsed(timestamp)
+
+    def isCyclesDepleted(self, timestamp=None):
+        return self.getCyclesRemaining(timestamp) < 0
+
+    def getRemainderValue(self):
+        return self._subvalue.copy()
+
+    def getCycleTime(self, cycles):
+        """
+        Return the earliest timestamps at which the elapsed cycles
+        reaches cycles, as a masked array with frozen buffers masked.
+        """
+
+        times = self.expiry + (numpy.asarray(cycles) - 1) * self.period + 1
+        return numpy.ma.masked_array(times, mask=self.freeze.copy())
+
+    def getDepletedTime(self):
+        return self.getCycleTime(self.getCyclesAvailable() + 1)
+
+    def getRemainderTime(self):
+        times = self.getDepletedTime()
+        times[self._subvalue == 0] = numpy.ma.masked
+        return times
+
+    def getLimitTime(self):
+        cycles_available = self.getCyclesAvailable()
+        times = self.getCycleTime(numpy.where(self._subvalue != 0,
+            cycles_available + 1, cycles_available))
+        settled = (self._subvalue == 0) & (cycles_available == 0)
+        return numpy.ma.where(settled & ~self.freeze, self.timestamp, times)
+
+    def getFreezeTime(self):
+        times = self.getDepletedTime()
+        return numpy.ma.masked_array(
+            numpy.where(self.freeze, self.timestamp, times.data),
+            mask=False)
+
+    def isToBeFrozen(self, timestamp=None, freeze=None):
+        """
+        Return whether the next state of each buffer will be frozen.
+        """
+
+        size = len(self)
+        if freeze is True:
+            return numpy.ones(size, dtype=bool)
+        depleted = self.isCyclesDepleted(timestamp)
+        if freeze is None:
+            return depleted | self.freeze
+        return depleted
+
+    def getCurrent(self, timestamp=None, freeze=None):
+        """
+        Returns a current version of all the buffers, as a new array.
+
+        Same semantics as `TimedBuffer.getCurrent`, applied to every
+        buffer at the same timestamp.
+        """
+
+        timestamp = self._timestamp(timestamp)
+
+        cycles_elapsed = self.getCyclesElapsed(timestamp)
+        cycles_available = self.getCyclesAvailable()
+        cycles_depleted = cycles_available - cycles_elapsed < 0
+
+        expiry = self.expiry + cycles_elapsed * self.period
+        if freeze is False:
+            expiry = numpy.where(self.freeze,
+                timestamp + self.period - 1, expiry)
+
+        if freeze is True:
+            next_freeze = numpy.ones(len(self), dtype=bool)
+        elif freeze is None:
+            next_freeze = cycles_depleted | self.freeze
+        else:
+            next_freeze = cycles_depleted
+
+        value = self.value + (
+            numpy.minimum(cycles_elapsed, cycles_available) * self.delta +
+            self._subvalue * cycles_depleted) * self.delta_factor
+
+        return self.__class__(
+            full=self.full,
+            value=value,
+            empty=self.empty,
+            delta=self.delta,
+            period=self.period,
+            timestamp=numpy.full(len(self), timestamp),
+            expiry=expiry,
+            delta_min=self.delta_min,
+            delta_factor=self.delta_factor,
+            freeze=next_freeze,
+        )
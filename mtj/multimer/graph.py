@@ -0,0 +1,104 @@
+from mtj.multimer.tracker import Event, Tracker
+
+
+def freezeAction(buffer, timestamp):
+    """
+    The default action for a link, which freezes the target buffer as
+    it was just before timestamp, so it is not charged for the cycle
+    that the source could not pay for.
+    """
+
+    return buffer.getCurrent(timestamp - 1, True).getCurrent(timestamp)
+
+
+class BufferGraph(object):
+    """
+    A set of named timed buffers where the freezing of one buffer, such
+    as by having its cycles depleted, acts on the buffers linked to it.
+
+    For instance, a reaction that moves items from one silo to another
+    is modelled by linking each silo to the other, so that the source
+    running empty or the target running full stops both of them.
+
+    Simulation jumps directly from one depletion to the next instead of
+    stepping through every cycle.
+    """
+
+    def __init__(self, scheduler='heap'):
+        """
+        scheduler - passed on to the underlying `Tracker`.
+        """
+
+        self.tracker = Tracker(cycles=False, scheduler=scheduler)
+        self.links = {}
+
+    def __len__(self):
+        return len(self.tracker)
+
+    def __contains__(self, key):
+        return key in self.tracker
+
+    def __getitem__(self, key):
+        return self.tracker[key]
+
+    def add(self, key, buffer):
+        self.tracker.add(key, buffer)
+
+    def link(self, source, target, action=freezeAction):
+        """
+        Apply action to the buffer under target whenever the buffer
+        under source becomes frozen.
+
+        action - a callable taking the target buffer and the timestamp,
+                 returning the new state of the target.  Default: freeze
+                 the target.
+        """
+
+        if source not in self.tracker:
+            raise KeyError(source)
+        if target not in self.tracker:
+            raise KeyError(target)
+        self.links.setdefault(source, []).append((target, action))
+
+    def _propagate(self, event):
+        # Breadth first, as a frozen target may have its own links.
+        events = []
+        pending = [event]
+        while pending:
+            source = pending.pop(0)
+            for target, action in self.links.get(source.key, ()):
+                previous = self.tracker[target]
+                if previous.freeze and action is freezeAction:
+                    continue
+                buffer = action(previous, source.timestamp)
+                self.tracker.update(target, buffer)
+                if buffer.freeze and not previous.freeze:
+                    kind = 'frozen'
+                else:
+                    kind = 'changed'
+                result = Event(source.timestamp, target, kind, buffer)
+                events.append(result)
+                if kind == 'frozen':
+                    pending.append(result)
+        return events
+
+    def simulate(self, timestamp):
+        """
+        Advance the graph up to timestamp, returning the events that
+        took place in order.  Buffers are only brought up to date at
+        their own events; use getCurrent for their state at any time.
+        """
+
+        events = []
+        while True:
+            upcoming = self.tracker.peekNext()
+            if upcoming is None or upcoming[0] > timestamp:
+                break
+            for event in self.tracker.popDue(upcoming[0]):
+                events.append(event)
+                if event.buffer.freeze:
+                    events.extend(self._propagate(event))
+        return events
+
+    def getCurrent(self, key, timestamp=None):
+        return self.tracker.getCurrent(key, timestamp)
@@ -0,0 +1,98 @@
+from bisect import bisect_right
+
+
+def isSameState(buffer, other):
+    """
+    Return whether two buffers are in the same state, regardless of the
+    timestamp they were taken at.
+    """
+
+    state = buffer.getState()
+    return state._replace(timestamp=None) == \
+        other.getState()._replace(timestamp=None)
+
+
+class History(object):
+    """
+    The recorded states of a single timed buffer, ordered by their
+    timestamps.
+
+    The value at any time is found by a binary search for the last
+    state recorded at or before it, which is then projected forward
+    with `getCurrent`.
+    """
+
+    def __init__(self, limit=None):
+        """
+        limit - the maximum number of states to keep; the oldest ones
+                are dropped once exceeded.  Default: unlimited.
+        """
+
+        assert limit is None or limit > 0
+
+        self.limit = limit
+
+        self._timestamps = []
+        self._states = []
+
+    def __len__(self):
+        return len(self._states)
+
+    def __iter__(self):
+        return iter(self._states)
+
+    def add(self, buffer):
+        """
+        Record a state of the buffer, either observed or derived.  A
+        state recorded at the same timestamp as an existing one takes
+        precedence over it.
+        """
+
+        index = bisect_right(self._timestamps, buffer.timestamp)
+        self._timestamps.insert(index, buffer.timestamp)
+        self._states.insert(index, buffer)
+
+        if self.limit is not None and len(self._states) > self.limit:
+            del self._timestamps[0]
+            del self._states[0]
+
+    def getState(self, timestamp):
+        """
+        Return the last state recorded at or before timestamp, or None
+        if there are none.
+        """
+
+        index = bisect_right(self._timestamps, timestamp)
+        if not index:
+            return None
+        return self._states[index - 1]
+
+    def getCurrent(self, timestamp):
+        """
+        Return the state of the buffer at timestamp as projected from
+        the history, or None if timestamp is before the history.
+        """
+
+        state = self.getState(timestamp)
+        if state is None:
+            return None
+        return state.getCurrent(timestamp)
+
+    def compact(self):
+        """
+        Drop every state that the projection of the state kept before
+        it reproduces, and return the number of states dropped.
+        """
+
+        if not self._states:
+            return 0
+
+        kept = [self._states[0]]
+        for state in self._states[1:]:
+            if not isSameState(kept[-1].getCurrent(state.timestamp), state):
+                kept.append(state)
+
+        dropped = len(self._states) - len(kept)
+        self._states = kept
+        self._timestamps = [state.timestamp for state in kept]
+        return dropped
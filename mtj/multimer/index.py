@@ -0,0 +1,111 @@
+from bisect import bisect_left, bisect_right
+
+
+class EventIndex(object):
+    """
+    An index of named timed buffers by the predicted time of an event,
+    such as when they become empty or full.
+
+    The predicted times are kept in a sorted list, so range and soonest
+    queries are binary searches.  Buffers that will never have the event
+    (i.e. frozen ones) are not indexed.
+    """
+
+    def __init__(self, method='getLimitTime'):
+        """
+        method - the name of the `TimedBuffer` method that returns the
+                 predicted time of the event, or None if there is none.
+                 Default: getLimitTime
+        """
+
+        self.method = method
+
+        self._events = {}
+        self._sorted = []
+        self._counter = 0
+
+    @classmethod
+    def fromBuffers(cls, items, *a, **kw):
+        """
+        Build an index from an iterable of key, buffer pairs.
+        """
+
+        index = cls(*a, **kw)
+        for key, buffer in items:
+            index.add(key, buffer)
+        return index
+
+    def __len__(self):
+        return len(self._events)
+
+    def __contains__(self, key):
+        return key in self._events
+
+    def getTime(self, key):
+        """
+        Return the indexed time for key.
+        """
+
+        return self._events[key][0]
+
+    def add(self, key, buffer):
+        """
+        Index the buffer under key.
+        """
+
+        if key in self._events:
+            raise KeyError('%r is already indexed' % (key,))
+        timestamp = getattr(buffer, self.method)()
+        if timestamp is None:
+            return
+        # the counter orders identical times without comparing keys.
+        self._counter += 1
+        event = (timestamp, self._counter, key)
+        self._events[key] = event
+        self._sorted.insert(bisect_right(self._sorted, event), event)
+
+    def remove(self, key):
+        """
+        Remove key from the index, if it is indexed.
+        """
+
+        event = self._events.pop(key, None)
+        if event is None:
+            return
+        del self._sorted[bisect_left(self._sorted, event)]
+
+    def update(self, key, buffer):
+        """
+        Reindex key with the new state of its buffer.
+        """
+
+        self.remove(key)
+        self.add(key, buffer)
+
+    def getRange(self, start=None, end=None):
+        """
+        Return the time and key of every buffer with its event between
+        start and end (inclusive), soonest first.
+        """
+
+        low = 0
+        high = len(self._sorted)
+        if start is not None:
+            low = bisect_left(self._sorted, (start,))
+        if end is not None:
+            # no tuple starting with end sorts after (end, inf).
+            high = bisect_left(self._sorted, (end, float('inf')))
+        return [(timestamp, key)
+            for timestamp, counter, key in self._sorted[low:high]]
+
+    def getSoonest(self, count, start=None):
+        """
+        Return the time and key of the count buffers with the soonest
+        events at or after start.
+        """
+
+        low = 0
+        if start is not None:
+            low = bisect_left(self._sorted, (start,))
+        return [(timestamp, key)
+            for timestamp, counter, key in self._sorted[low:low + count]]
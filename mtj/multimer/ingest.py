@@ -0,0 +1,109 @@
+"""
+Reconciliation of observed buffer values against tracked buffers.
+"""
+
+import copy
+from collections import namedtuple
+
+from mtj.multimer.schedule import ScheduledTimedBuffer
+from mtj.multimer.tracker import Event
+
+Observation = namedtuple('Observation', ['timestamp', 'key', 'value'])
+
+
+def rebuildBuffer(projected, value, timestamp):
+    """
+    Return the projected state of a buffer with its value replaced by
+    the observed value at timestamp.
+
+    The expiry of the projection is kept, as an observation says
+    nothing about when the cycle ends, unless the projection was frozen
+    by having its cycles depleted (i.e. it has no cycles possible).
+    Then the buffer has been replenished, so it is unfrozen with a new
+    cycle starting at timestamp.
+    """
+
+    if not projected.empty <= value <= projected.full:
+        raise ValueError('observed value %r is out of range' % (value,))
+    buffer = copy.copy(projected)
+    depleted = projected.freeze and not projected.getCyclesPossible()
+    buffer.value = value
+    buffer.timestamp = timestamp
+    if depleted:
+        buffer.freeze = False
+        buffer.expiry = timestamp + buffer.period - 1
+    if isinstance(buffer, ScheduledTimedBuffer):
+        # the segments were projected from the previous value.
+        buffer._setSchedule(buffer.getSchedule())
+    return buffer
+
+
+class Reconciler(object):
+    """
+    Compares observations of the values of buffers with what a
+    `Tracker` projects them to be, and only updates the tracker where
+    they differ.
+
+    Observations with the value as projected, or older than the tracked
+    state, are dropped.
+    """
+
+    def __init__(self, tracker, tolerance=0, rebuild=rebuildBuffer):
+        """
+        tracker - the `Tracker` with the buffers to reconcile.
+        tolerance - the largest difference between the observed and
+                    projected value that is not a divergence.
+                    Default: 0
+        rebuild - a callable taking the projected buffer, the observed
+                  value and timestamp, returning the new buffer.
+                  Default: `rebuildBuffer`
+        """
+
+        self.tracker = tracker
+        self.tolerance = tolerance
+        self.rebuild = rebuild
+
+        self.observed = 0
+        self.dropped = 0
+        self.changed = 0
+
+    def getStats(self):
+        return {
+            'observed': self.observed,
+            'dropped': self.dropped,
+            'changed': self.changed,
+        }
+
+    def reconcile(self, key, value, timestamp):
+        """
+        Reconcile the value observed for the buffer tracked under key
+        at timestamp, and return the resulting 'observed' `Event`, or
+        None if it was dropped.
+        """
+
+        self.observed += 1
+        tracked = self.tracker[key]
+        if timestamp < tracked.timestamp:
+            self.dropped += 1
+            return None
+
+        projected = self.tracker.getCurrent(key, timestamp)
+        if abs(projected.value - value) <= self.tolerance:
+            self.dropped += 1
+            return None
+
+        buffer = self.rebuild(projected, value, timestamp)
+        self.tracker.update(key, buffer)
+        self.changed += 1
+        return Event(timestamp, key, 'observed', buffer)
+
+    def feed(self, observations):
+        """
+        Reconcile an iterable of `Observation` (or timestamp, key, value
+        tuples), generating the events for those that changed a buffer.
+        """
+
+        for timestamp, key, value in observations:
+            event = self.reconcile(key, value, timestamp)
+            if event is not None:
+                yield event
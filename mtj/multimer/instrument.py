@@ -0,0 +1,140 @@
+"""
+Counters and timings for the methods of buffers.
+
+Nothing is measured until an `Instrumentation` is installed on a class,
+which replaces its getCurrent, isToBeFrozen and freeze predicates with
+wrappers that measure them, so there is no cost otherwise.
+"""
+
+import time
+from functools import wraps
+
+from mtj.multimer.buffer import TimedBuffer
+
+try:
+    timer = time.perf_counter
+except AttributeError:  # pragma: no cover
+    timer = time.time
+
+methods = ('getCurrent', 'isToBeFrozen')
+
+
+def _getOriginal(cls, name):
+    # The function for name as defined in the class hierarchy, without
+    # any wrapper installed on it.
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            f = klass.__dict__[name]
+            return getattr(f, 'original', f)
+    raise AttributeError(name)
+
+
+class Instrumentation(object):
+    """
+    Counts the calls to and time spent in the methods of buffer classes
+    it is installed on, and how many times each freeze predicate caused
+    a buffer to be frozen.
+
+    Time spent in a method includes the time spent in the methods it
+    calls, such as isToBeFrozen and the predicates for getCurrent.
+    """
+
+    def __init__(self, callback=None):
+        """
+        callback - a callable taking the name, the elapsed time and the
+                   result of every measured call.  Default: None
+        """
+
+        self.callback = callback
+        self.calls = {}
+        self.elapsed = {}
+        self.triggers = {}
+        self.caches = {}
+
+        self._installed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def _record(self, name, elapsed, result):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.elapsed[name] = self.elapsed.get(name, 0) + elapsed
+        if self.callback is not None:
+            self.callback(name, elapsed, result)
+
+    def _wrap(self, name, f, predicate=False):
+        record = self._record
+        triggers = self.triggers
+
+        @wraps(f)
+        def wrapper(*a, **kw):
+            start = timer()
+            result = f(*a, **kw)
+            record(name, timer() - start, result)
+            if predicate and result:
+                triggers[name] = triggers.get(name, 0) + 1
+            return result
+
+        wrapper.original = f
+        return wrapper
+
+    def install(self, cls=TimedBuffer):
+        """
+        Start measuring the methods of cls, which are recorded under
+        their names prefixed with the name of cls.  Instances of
+        subclasses are measured too, unless they override the methods.
+        """
+
+        names = [(name, False) for name in methods] + [
+            (name, True) for name in cls.getFreezePredicates()]
+        for name, predicate in names:
+            f = _getOriginal(cls, name)
+            label = '%s.%s' % (cls.__name__, name)
+            self._installed.append((cls, name, cls.__dict__.get(name)))
+            setattr(cls, name, self._wrap(label, f, predicate))
+
+    def uninstall(self):
+        """
+        Restore the methods of every class this was installed on.
+        """
+
+        while self._installed:
+            cls, name, previous = self._installed.pop()
+            if previous is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, previous)
+
+    def addCache(self, name, cache):
+        """
+        Include the statistics of a `CurrentCache` under name.
+        """
+
+        self.caches[name] = cache
+
+    def reset(self):
+        """
+        Reset all the counters, including those of the caches.
+        """
+
+        self.calls.clear()
+        self.elapsed.clear()
+        self.triggers.clear()
+        for cache in self.caches.values():
+            cache.hits = cache.misses = cache.evictions = 0
+
+    def getStats(self):
+        """
+        Return the counters as a dict.
+        """
+
+        return {
+            'calls': dict(self.calls),
+            'elapsed': dict(self.elapsed),
+            'triggers': dict(self.triggers),
+            'caches': dict((name, cache.getStats())
+                for name, cache in self.caches.items()),
+        }
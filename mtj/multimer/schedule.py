@@ -0,0 +1,162 @@
+from bisect import bisect_left, bisect_right
+from itertools import groupby
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.clock import now
+
+
+def buildSegments(buffer, schedule):
+    """
+    Return the starting timestamps and the states of the buffer at the
+    start of each of the segments of the schedule, which is a sequence
+    of start, delta, period tuples in ascending order of start, all
+    after the timestamp of the buffer.
+
+    The state at the start of a segment is the state of the previous
+    segment projected to that start, as if it was replaced by a new
+    buffer with the new delta and period.  A frozen buffer stays
+    frozen.
+    """
+
+    starts = []
+    states = []
+    state = TimedBuffer.fromState(buffer.getState())
+    for start, delta, period in schedule:
+        assert period > 0
+        assert start > state.timestamp
+        current = state.getCurrent(start)
+        state = TimedBuffer(delta=delta, period=period, timestamp=start,
+            delta_min=current.delta_min, delta_factor=current.delta_factor,
+            freeze=current.freeze, full=current.full, value=current.value,
+            empty=current.empty)
+        starts.append(start)
+        states.append(state)
+    return starts, states
+
+
+class ScheduledTimedBuffer(TimedBuffer):
+    """
+    A timed buffer with its delta and period changing over time
+    according to a schedule.
+
+    The states at the start of every segment of the schedule are
+    computed once, and shared by every state derived from this one
+    with getCurrent, so finding the state at any timestamp is a binary
+    search over the segments.  The cycle methods inherited from
+    `TimedBuffer` describe the current segment only.  Explicitly
+    freezing or unfreezing recomputes the segments.
+    """
+
+    __slots__ = ('_segments',)
+
+    def __init__(self, schedule=(), *a, **kw):
+        """
+        schedule - sequence of start, delta, period tuples, for the
+                   changes after timestamp.
+
+        All other arguments are as `TimedBuffer`.
+        """
+
+        super(ScheduledTimedBuffer, self).__init__(*a, **kw)
+        self._setSchedule(sorted(schedule))
+
+    def _setSchedule(self, schedule):
+        starts, states = buildSegments(self, schedule)
+        frozen = [state.freeze for state in states]
+        self._segments = (starts, states, tuple(schedule), frozen)
+
+    def getSchedule(self):
+        """
+        Return the start, delta, period tuples of the segments after
+        the timestamp of this buffer.
+        """
+
+        starts, states, schedule, frozen = self._segments
+        return schedule[bisect_right(starts, self.timestamp):]
+
+    def _getIndex(self, timestamp):
+        # The index of the segment for timestamp, or None if it is the
+        # segment this buffer is in.
+        starts = self._segments[0]
+        index = bisect_right(starts, timestamp) - 1
+        if index < 0 or starts[index] <= self.timestamp:
+            return None
+        return index
+
+    def _getSegment(self, index):
+        # The plain state at the start of the segment at index.
+        if index is None:
+            return TimedBuffer.fromState(self.getState())
+        return self._segments[1][index]
+
+    def getCurrent(self, timestamp=None, freeze=None):
+        """
+        Returns a current version of this buffer, following the
+        schedule.
+        """
+
+        if timestamp is None:
+            timestamp = now()
+
+        segment = self._getSegment(self._getIndex(timestamp))
+        current = segment.getCurrent(timestamp, freeze)
+        result = self.fromState(current.getState())
+        result._segments = self._segments
+        if freeze is not None:
+            # the course has changed, so the segments no longer apply.
+            result._setSchedule(result.getSchedule())
+        return result
+
+    def _getFinalIndex(self):
+        # The index of the segment in which the buffer becomes frozen,
+        # found by a binary search as freezing carries forward.
+        starts, states, schedule, frozen = self._segments
+        first = bisect_right(starts, self.timestamp)
+        index = bisect_left(frozen, True, first)
+        if index == first:
+            return None
+        return index - 1
+
+    def getDepletedTime(self):
+        return self._getSegment(self._getFinalIndex()).getDepletedTime()
+
+    def getRemainderTime(self):
+        return self._getSegment(self._getFinalIndex()).getRemainderTime()
+
+    def getFreezeTime(self):
+        return self._getSegment(self._getFinalIndex()).getFreezeTime()
+
+    def getLimitTime(self):
+        index = self._getFinalIndex()
+        segment = self._getSegment(index)
+        limit = segment.getLimitTime()
+        # a segment that started at its limit got there in an earlier
+        # one, by the last cycle up to the start it was replaced at, as
+        # that start includes the cycles due at it.
+        while index is not None and limit == segment.timestamp:
+            end = segment.timestamp
+            index = self._getIndex(end - 1)
+            segment = self._getSegment(index)
+            limit = segment.getLimitTime()
+            if limit > end:
+                cycles = segment.getCyclesElapsed(end)
+                if cycles:
+                    limit = segment.getCycleTime(cycles)
+                else:
+                    limit = segment.timestamp
+        return limit
+
+    def iterSamples(self, timestamps, breakpoints=False):
+        """
+        As `TimedBuffer.iterSamples`, following the schedule.
+        """
+
+        previous = None
+        for index, group in groupby(timestamps, self._getIndex):
+            segment = self._getSegment(index)
+            for sample in segment.iterSamples(group):
+                if breakpoints:
+                    if previous == sample[1:]:
+                        continue
+                    previous = sample[1:]
+                yield sample
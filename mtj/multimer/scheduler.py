@@ -0,0 +1,283 @@
+import heapq
+
+
+class HeapScheduler(object):
+    """
+    Schedules keys at timestamps using a binary heap.
+
+    Rescheduling and cancelling leave a stale entry in the heap, which
+    is discarded once it reaches the top.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._queue = []
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def push(self, key, timestamp, kind=None):
+        """
+        Schedule key at timestamp, replacing any existing schedule.
+        """
+
+        self.cancel(key)
+        # the counter keeps the ordering stable for identical times.
+        self._counter += 1
+        entry = [timestamp, self._counter, key, kind]
+        self._entries[key] = entry
+        heapq.heappush(self._queue, entry)
+
+    def cancel(self, key):
+        """
+        Remove the schedule of key, if any.
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            # lazily removed from the queue once it reaches the top,
+            # unless the removed entries start to dominate the queue.
+            entry[2] = None
+            if len(self._queue) > 2 * len(self._entries) + 16:
+                self._queue = [e for e in self._queue if e[2] is not None]
+                heapq.heapify(self._queue)
+
+    def _prune(self):
+        while self._queue and self._queue[0][2] is None:
+            heapq.heappop(self._queue)
+
+    def peek(self):
+        """
+        Return the timestamp, key and kind of the earliest schedule as
+        a tuple, or None if nothing is scheduled.
+        """
+
+        self._prune()
+        if not self._queue:
+            return None
+        timestamp, counter, key, kind = self._queue[0]
+        return timestamp, key, kind
+
+    def popDue(self, timestamp):
+        """
+        Remove and return every schedule at or before timestamp as a
+        list of timestamp, key and kind tuples, earliest first.
+        """
+
+        result = []
+        self._prune()
+        while self._queue and self._queue[0][0] <= timestamp:
+            entry_timestamp, counter, key, kind = heapq.heappop(self._queue)
+            del self._entries[key]
+            result.append((entry_timestamp, key, kind))
+            self._prune()
+        return result
+
+
+class WheelScheduler(object):
+    """
+    Schedules keys at integer timestamps using a hierarchical timing
+    wheel.
+
+    Each of the levels has 2 ** bits slots, with every slot of a level
+    spanning a full rotation of the level below it.  Insertion and
+    cancellation are O(1), and advancing the wheel moves each entry
+    down at most once per level.  Empty slots are skipped through a
+    bitmask of the occupied slots of each level, so quiet periods cost
+    nothing to advance over.  Schedules beyond the span of the top
+    level are kept aside until the wheel gets to them.
+    """
+
+    def __init__(self, bits=6, levels=6, start=None):
+        """
+        bits - the number of bits of the timestamp for each level.
+        levels - the number of levels.
+        start - the initial position of the wheel.  Default: one before
+                the first scheduled timestamp.
+        """
+
+        assert bits > 0
+        assert levels > 0
+
+        self.bits = bits
+        self.levels = levels
+        self.now = start
+
+        self._mask = (1 << bits) - 1
+        self._slots = [[{} for i in range(1 << bits)] for i in range(levels)]
+        self._occupied = [0] * levels
+        self._overflow = {}
+        self._due = []
+        self._entries = {}
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _place(self, entry):
+        timestamp = entry[0]
+        key = entry[2]
+        if timestamp <= self.now:
+            heapq.heappush(self._due, entry)
+            self._entries[key] = (entry, None)
+            return
+
+        # the highest differing bit with the current position decides
+        # the level.
+        difference = timestamp ^ self.now
+        if difference > 0:
+            level = (difference.bit_length() - 1) // self.bits
+            if level < self.levels:
+                index = (timestamp >> (self.bits * level)) & self._mask
+                self._slots[level][index][key] = entry
+                self._occupied[level] |= 1 << index
+                self._entries[key] = (entry, (level, index))
+                return
+
+        epoch = timestamp >> (self.bits * self.levels)
+        self._overflow.setdefault(epoch, {})[key] = entry
+        self._entries[key] = (entry, (self.levels, epoch))
+
+    def _take(self, level, index):
+        if level == self.levels:
+            return self._overflow.pop(index)
+        bucket = self._slots[level][index]
+        self._slots[level][index] = {}
+        self._occupied[level] &= ~(1 << index)
+        return bucket
+
+    def _nextSlot(self):
+        """
+        Return the level, index and starting timestamp of the earliest
+        occupied slot, or None.
+        """
+
+        for level in range(self.levels):
+            shift = self.bits * level
+            current = (self.now >> shift) & self._mask
+            occupied = self._occupied[level] >> (current + 1)
+            if occupied:
+                index = current + (occupied & -occupied).bit_length()
+                upper = shift + self.bits
+                start = (self.now >> upper << upper) | (index << shift)
+                return level, index, start
+
+        if self._overflow:
+            epoch = min(self._overflow)
+            return self.levels, epoch, epoch << (self.bits * self.levels)
+
+        return None
+
+    def _advance(self, timestamp):
+        while True:
+            slot = self._nextSlot()
+            if slot is None or slot[2] > timestamp:
+                break
+            level, index, start = slot
+            self.now = start
+            for entry in self._take(level, index).values():
+                self._place(entry)
+        self.now = timestamp
+
+    def push(self, key, timestamp, kind=None):
+        """
+        Schedule key at timestamp, replacing any existing schedule.
+        """
+
+        self.cancel(key)
+        if self.now is None:
+            self.now = timestamp - 1
+        self._counter += 1
+        self._place([timestamp, self._counter, key, kind])
+
+    def cancel(self, key):
+        """
+        Remove the schedule of key, if any.
+        """
+
+        entry, location = self._entries.pop(key, (None, None))
+        if entry is None:
+            return
+        if location is None:
+            # lazily removed from the due heap.
+            entry[2] = None
+            return
+        level, index = location
+        if level == self.levels:
+            bucket = self._overflow[index]
+            del bucket[key]
+            if not bucket:
+                del self._overflow[index]
+            return
+        bucket = self._slots[level][index]
+        del bucket[key]
+        if not bucket:
+            self._occupied[level] &= ~(1 << index)
+
+    def _prune(self):
+        while self._due and self._due[0][2] is None:
+            heapq.heappop(self._due)
+
+    def peek(self):
+        """
+        Return the timestamp, key and kind of the earliest schedule as
+        a tuple, or None if nothing is scheduled.
+        """
+
+        if not self._entries:
+            return None
+
+        self._prune()
+        if self._due:
+            entry = self._due[0]
+        else:
+            level, index, start = self._nextSlot()
+            if level == self.levels:
+                bucket = self._overflow[index]
+            else:
+                bucket = self._slots[level][index]
+            entry = min(bucket.values())
+        timestamp, counter, key, kind = entry
+        return timestamp, key, kind
+
+    def popDue(self, timestamp):
+        """
+        Remove and return every schedule at or before timestamp as a
+        list of timestamp, key and kind tuples, earliest first.
+        """
+
+        if self.now is not None and timestamp > self.now:
+            self._advance(timestamp)
+
+        result = []
+        self._prune()
+        while self._due and self._due[0][0] <= timestamp:
+            entry_timestamp, counter, key, kind = heapq.heappop(self._due)
+            del self._entries[key]
+            result.append((entry_timestamp, key, kind))
+            self._prune()
+        return result
+
+
+schedulers = {
+    'heap': HeapScheduler,
+    'wheel': WheelScheduler,
+}
+
+
+def getScheduler(scheduler):
+    """
+    Return a scheduler instance from the name of a scheduler in
+    schedulers, or the scheduler itself if it is already one.
+    """
+
+    if scheduler in schedulers:
+        return schedulers[scheduler]()
+    return scheduler
@@ -0,0 +1,113 @@
+"""
+Evaluation of many buffers spread over a pool of processes.
+
+The buffers are sent to the workers as chunks of plain state tuples,
+which pickle far smaller and faster than the buffers themselves, and
+the results are put back together in the order of the buffers.
+"""
+
+from functools import partial
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:  # pragma: no cover
+    ProcessPoolExecutor = None
+
+from mtj.multimer.buffer import TimedBuffer
+
+
+def _evaluateChunk(func, factory, states):
+    return [func(factory.fromState(state)) for state in states]
+
+
+def getProjection(buffer, timestamps):
+    """
+    Return a dict with the depletion and limit times of the buffer, and
+    the samples at the timestamps where the value or freeze changes,
+    as a projection of the buffer over the timestamps.
+
+    Use with functools.partial to fix the timestamps.
+    """
+
+    return {
+        'depleted': buffer.getDepletedTime(),
+        'limit': buffer.getLimitTime(),
+        'samples': list(buffer.iterSamples(timestamps, breakpoints=True)),
+    }
+
+
+def projectBuffers(buffers, start, end, step, **kw):
+    """
+    Return the projections (as `getProjection`) of the buffers from
+    start to end (exclusive) every step seconds.  Other arguments are
+    passed on to `ShardedEvaluator`.
+    """
+
+    timestamps = range(start, end, step)
+    return ShardedEvaluator(**kw).map(
+        partial(getProjection, timestamps=timestamps), buffers)
+
+
+class ShardedEvaluator(object):
+    """
+    Applies a function to every one of a collection of timed buffers,
+    in a pool of processes.
+    """
+
+    def __init__(self, workers=None, chunksize=1000, factory=TimedBuffer,
+            threshold=None):
+        """
+        workers - the number of processes, or 0 to evaluate in this
+                  process.  Default: the number of processors.
+        chunksize - the number of buffers sent to a process at a time.
+                    Default: 1000
+        factory - the `TimedBuffer` class to recreate the buffers as in
+                  the processes.  Default: TimedBuffer
+        threshold - evaluate in this process when there are no more
+                    buffers than this, as the processes would cost more
+                    than they save.  Default: chunksize
+        """
+
+        assert chunksize > 0
+
+        if ProcessPoolExecutor is None:
+            workers = 0
+
+        self.workers = workers
+        self.chunksize = chunksize
+        self.factory = factory
+        self.threshold = chunksize if threshold is None else threshold
+
+    def _chunk(self, states):
+        for start in range(0, len(states), self.chunksize):
+            yield states[start:start + self.chunksize]
+
+    def mapStates(self, func, states):
+        """
+        Return the results of func for the buffers with the states,
+        which are `TimedBufferState` or equivalent tuples, in order.
+
+        func must be picklable, such as a function defined at the top
+        level of a module or a functools.partial of one.
+        """
+
+        states = [tuple(state) for state in states]
+        chunks = self._chunk(states)
+        evaluate = partial(_evaluateChunk, func, self.factory)
+
+        if self.workers == 0 or len(states) <= self.threshold:
+            results = map(evaluate, chunks)
+            return [result for chunk in results for result in chunk]
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            # map yields the results in the order of the chunks.
+            results = executor.map(evaluate, chunks)
+            return [result for chunk in results for result in chunk]
+
+    def map(self, func, buffers):
+        """
+        Return the results of func for each of the buffers, in order.
+        """
+
+        return self.mapStates(func,
+            (buffer.getState() for buffer in buffers))
@@ -0,0 +1,336 @@
+"""
+Buffer states in shared memory, written by one process and read by any
+number of others without locking.
+
+The states are stored as columns, so readers evaluate them in place as
+a `TimedBufferArray`.  Consistency is kept with a sequence lock: the
+writer increments a sequence number before and after every change, and
+a reader retries whenever the number was odd or changed while it read.
+This relies on the writes becoming visible to other processes in the
+order they were made, as they do on x86.
+
+Requires Python 3.8 and numpy.
+"""
+
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy
+
+from mtj.multimer.buffer import TimedBuffer, TimedBufferState
+from mtj.multimer.columnar import TimedBufferArray
+
+# sequence, capacity, key size, count
+header = numpy.dtype('<u8')
+header_size = 4
+
+dtypes = {
+    'full': '<i8',
+    'value': '<i8',
+    'empty': '<i8',
+    'delta': '<i8',
+    'period': '<i8',
+    'timestamp': '<i8',
+    'expiry': '<i8',
+    'delta_min': '<f8',
+    'delta_factor': 'i1',
+    'freeze': '?',
+}
+
+
+def _attach(name):
+    # Attach to an existing block without the resource tracker of this
+    # process taking ownership of it, as it would unlink the block when
+    # this process exits.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Unregistering after attaching would also drop the registration of
+    # the writer when it shares the tracker (same or forked process),
+    # so the block is never registered instead.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def _layout(capacity, keysize):
+    # the offsets of the key and state columns, and the total size.
+    columns = []
+    offset = header.itemsize * header_size
+    for name, dtype in [('key', 'S%d' % keysize)] + [
+            (name, dtypes[name]) for name in TimedBufferState._fields]:
+        dtype = numpy.dtype(dtype)
+        columns.append((name, dtype, offset))
+        offset = _align(offset + dtype.itemsize * capacity)
+    return columns, offset
+
+
+class _SharedColumns(object):
+    # The views of the header and columns of a shared memory block.
+
+    def _map(self, shm, capacity, keysize):
+        self._shm = shm
+        self._header = numpy.ndarray(header_size, dtype=header,
+            buffer=shm.buf)
+        self._columns = {}
+        columns, size = _layout(capacity, keysize)
+        for name, dtype, offset in columns:
+            self._columns[name] = numpy.ndarray(capacity, dtype=dtype,
+                buffer=shm.buf, offset=offset)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def capacity(self):
+        return int(self._header[1])
+
+    def _encode(self, key):
+        if not isinstance(key, bytes):
+            key = key.encode('utf8')
+        if len(key) > self._columns['key'].dtype.itemsize:
+            raise ValueError('key %r is too long' % (key,))
+        return key
+
+    def _getArray(self, count):
+        # The states as an array over the shared columns, not a copy.
+        return TimedBufferArray(**dict(
+            (name, self._columns[name][:count])
+            for name in TimedBufferState._fields))
+
+    def _getRow(self, index):
+        return TimedBuffer.fromState(self._columns[name][index].item()
+            for name in TimedBufferState._fields)
+
+    def close(self):
+        """
+        Release the views and detach from the shared memory.
+        """
+
+        self._header = None
+        self._columns = {}
+        self._shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedBufferTable(_SharedColumns):
+    """
+    The writing side of a table of named buffers in shared memory.
+    There must only be one of these for a table.
+
+    Keys are stored in a fixed number of bytes; strings are encoded as
+    UTF-8.  The columns are 64 bit integers apart from delta_min, so
+    the values of the buffers must be integers.
+    """
+
+    def __init__(self, capacity, keysize=32, name=None):
+        """
+        capacity - the maximum number of buffers.
+        keysize - the maximum length of a key in bytes.  Default: 32
+        name - the name of the shared memory block to create.
+               Default: a generated name.
+        """
+
+        columns, size = _layout(capacity, keysize)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._map(shm, capacity, keysize)
+        self._header[:] = (0, capacity, keysize, 0)
+        self._rows = {}
+        self._keys = []
+
+    def unlink(self):
+        """
+        Destroy the shared memory block, once every process is done
+        with it.
+        """
+
+        self._shm.unlink()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __getitem__(self, key):
+        return self._getRow(self._rows[key])
+
+    def keys(self):
+        return list(self._keys)
+
+    def _begin(self):
+        self._header[0] += 1
+
+    def _end(self):
+        self._header[0] += 1
+
+    def _write(self, index, key, buffer):
+        self._columns['key'][index] = self._encode(key)
+        for name, value in zip(TimedBufferState._fields, buffer.getState()):
+            self._columns[name][index] = value
+
+    def updateMany(self, items):
+        """
+        Add or replace the buffers for an iterable of key, buffer pairs,
+        as a single change.
+        """
+
+        items = [(key, self._encode(key), buffer) for key, buffer in items]
+        new = set(key for key, encoded, buffer in items
+            if key not in self._rows)
+        if len(self._keys) + len(new) > self.capacity:
+            raise ValueError('table is full')
+
+        self._begin()
+        try:
+            for key, encoded, buffer in items:
+                index = self._rows.get(key)
+                if index is None:
+                    index = self._rows[key] = len(self._keys)
+                    self._keys.append(key)
+                self._write(index, key, buffer)
+            self._header[3] = len(self._keys)
+        finally:
+            self._end()
+
+    def update(self, key, buffer):
+        """
+        Add or replace the buffer for key.
+        """
+
+        self.updateMany([(key, buffer)])
+
+    def remove(self, key):
+        """
+        Remove the buffer for key, moving the last buffer into its row.
+        """
+
+        index = self._rows.pop(key)
+        last = self._keys.pop()
+        self._begin()
+        try:
+            if last != key:
+                self._rows[last] = index
+                self._keys[index] = last
+                for column in self._columns.values():
+                    column[index] = column[len(self._keys)]
+            self._header[3] = len(self._keys)
+        finally:
+            self._end()
+
+
+class SharedBufferView(_SharedColumns):
+    """
+    The reading side of a `SharedBufferTable`, which can be used from
+    any number of processes.  Nothing is copied out of the shared memory
+    to evaluate the buffers.
+    """
+
+    def __init__(self, name):
+        """
+        name - the name of the shared memory block of the table.
+        """
+
+        shm = _attach(name)
+        start = numpy.ndarray(header_size, dtype=header, buffer=shm.buf)
+        capacity, keysize = int(start[1]), int(start[2])
+        del start
+        self._map(shm, capacity, keysize)
+
+    def read(self, f):
+        """
+        Return the result of calling f with the count of the buffers and
+        the states of the buffers as a `TimedBufferArray` over the shared
+        columns, calling it again if the table was changed meanwhile.
+
+        f must not return anything referencing the columns, as they may
+        be changed at any time after.
+        """
+
+        while True:
+            sequence = int(self._header[0])
+            if sequence & 1:
+                # a change is in progress.
+                time.sleep(0)
+                continue
+            count = int(self._header[3])
+            try:
+                result = f(count, self._getArray(count))
+            except Exception:
+                # a partly changed state may not be valid.
+                if self._header[0] == sequence:
+                    raise
+                continue
+            if self._header[0] == sequence:
+                return result
+
+    def __len__(self):
+        return self.read(lambda count, array: count)
+
+    def keys(self):
+        return self.read(lambda count, array: [
+            key.decode('utf8') for key in self._columns['key'][:count]])
+
+    def _find(self, key, count):
+        found = numpy.flatnonzero(
+            self._columns['key'][:count] == self._encode(key))
+        if not len(found):
+            raise KeyError(key)
+        return found[0]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key):
+        return self.read(lambda count, array: self._getRow(
+            self._find(key, count)))
+
+    def getCurrent(self, key, timestamp=None):
+        """
+        Return the current state of the buffer for key.
+        """
+
+        return self[key].getCurrent(timestamp)
+
+    def evaluate(self, method, *a, **kw):
+        """
+        Return the result of calling the `TimedBufferArray` method on
+        all the buffers, in the order of keys.  An array returned by
+        getCurrent is copied out of the shared memory.
+        """
+
+        def f(count, array):
+            result = getattr(array, method)(*a, **kw)
+            if isinstance(result, TimedBufferArray):
+                result = TimedBufferArray(**dict(
+                    (name, numpy.array(getattr(result, name)))
+                    for name in TimedBufferArray.fields))
+            return result
+
+        return self.read(f)
+
+    def getValues(self, timestamp=None):
+        """
+        Return the current values of all the buffers, in the order of
+        keys.
+        """
+
+        return self.read(lambda count, array: array.getCurrent(
+            timestamp).value)
@@ -0,0 +1,183 @@
+"""
+A compact binary format for the states of buffers.
+
+A snapshot is a header followed by one fixed width record per buffer,
+all little endian:
+
+header - magic (4 bytes), version (uint16), record size (uint16),
+         number of records (uint64).
+record - full, value, empty, delta, period, timestamp, expiry,
+         delta_min (float64 each), delta_factor (int8), freeze (uint8),
+         flags (uint16), padding (4 bytes).
+
+Bit n of the flags is set when field n was an integer rather than a
+float, so the types are restored on load, and the top bit is set for a
+plain `Buffer`, which only has the first three fields.
+"""
+
+import mmap
+import struct
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from mtj.multimer.buffer import Buffer, TimedBuffer
+
+MAGIC = b'MTJB'
+VERSION = 1
+
+header = struct.Struct('<4sHHQ')
+record = struct.Struct('<8dbBH4x')
+
+numeric_fields = ('full', 'value', 'empty', 'delta', 'period', 'timestamp',
+    'expiry', 'delta_min')
+PLAIN = 1 << 15
+
+try:
+    integer_types = (int, long)
+except NameError:  # pragma: no cover
+    integer_types = (int,)
+
+
+def packBuffer(buffer):
+    """
+    Return the record for buffer as bytes.
+    """
+
+    if isinstance(buffer, TimedBuffer):
+        values = [getattr(buffer, name) for name in numeric_fields]
+        delta_factor = buffer.delta_factor
+        freeze = buffer.freeze
+        flags = 0
+    else:
+        values = [buffer.full, buffer.value, buffer.empty] + [0] * 5
+        delta_factor = 1
+        freeze = False
+        flags = PLAIN
+
+    for n, value in enumerate(values):
+        if isinstance(value, integer_types):
+            flags |= 1 << n
+    return record.pack(*(values + [delta_factor, bool(freeze), flags]))
+
+
+def unpackBuffer(data, offset=0, factory=TimedBuffer):
+    """
+    Return the buffer for the record at offset of data.  Timed buffers
+    are created with factory.fromState.
+    """
+
+    fields = record.unpack_from(data, offset)
+    flags = fields[10]
+    values = [int(value) if flags & (1 << n) else value
+        for n, value in enumerate(fields[:8])]
+    if flags & PLAIN:
+        return Buffer(full=values[0], value=values[1], empty=values[2])
+    return factory.fromState(values + [fields[8], bool(fields[9])])
+
+
+def writeSnapshot(stream, buffers):
+    """
+    Write the buffers to the binary stream as a snapshot, and return the
+    number written.
+    """
+
+    buffers = list(buffers)
+    stream.write(header.pack(MAGIC, VERSION, record.size, len(buffers)))
+    for buffer in buffers:
+        stream.write(packBuffer(buffer))
+    return len(buffers)
+
+
+class SnapshotView(object):
+    """
+    A read-only view of a snapshot file, which is memory mapped rather
+    than read.  Records are only turned into buffers when accessed.
+    """
+
+    def __init__(self, path, factory=TimedBuffer):
+        """
+        path - the path to the snapshot.
+        factory - the `TimedBuffer` class to create the timed buffers
+                  as.  Default: TimedBuffer
+        """
+
+        self.factory = factory
+
+        with open(path, 'rb') as fd:
+            self._map = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < header.size:
+            self.close()
+            raise ValueError('%r is truncated' % (path,))
+        magic, version, size, count = header.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError('%r is not a snapshot' % (path,))
+        if version != VERSION or size != record.size:
+            self.close()
+            raise ValueError('unsupported snapshot version %d' % version)
+        if header.size + count * size > len(self._map):
+            self.close()
+            raise ValueError('%r is truncated' % (path,))
+        self._count = count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the file.  Arrays returned by getColumns or toArray must
+        be released first.
+        """
+
+        self._map.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return unpackBuffer(self._map, header.size + index * record.size,
+            self.factory)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def getColumns(self):
+        """
+        Return the records as a numpy structured array backed directly
+        by the mapped file.
+        """
+
+        if numpy is None:
+            raise ImportError('numpy is required for getColumns')
+        dtype = numpy.dtype([(name, '<f8') for name in numeric_fields] + [
+            ('delta_factor', 'i1'), ('freeze', 'u1'), ('flags', '<u2'),
+            ('padding', 'V4')])
+        return numpy.frombuffer(self._map, dtype=dtype, count=self._count,
+            offset=header.size)
+
+    def toArray(self):
+        """
+        Return a `TimedBufferArray` of the records, for evaluating them
+        all at once.  Plain buffers are not supported.
+        """
+
+        from mtj.multimer.columnar import TimedBufferArray
+
+        columns = self.getColumns()
+        if (columns['flags'] & PLAIN).any():
+            raise ValueError('snapshot contains plain buffers')
+        kw = dict((name, columns[name]) for name in numeric_fields)
+        return TimedBufferArray(delta_factor=columns['delta_factor'],
+            freeze=columns['freeze'], **kw)
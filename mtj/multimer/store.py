@@ -0,0 +1,126 @@
+import sqlite3
+
+from mtj.multimer.buffer import TimedBuffer, TimedBufferState
+
+fields = TimedBufferState._fields
+
+schema = [
+    'CREATE TABLE IF NOT EXISTS buffer (key TEXT PRIMARY KEY, %s, '
+        'depleted)' % ', '.join(fields),
+    'CREATE INDEX IF NOT EXISTS buffer_expiry ON buffer (expiry)',
+    'CREATE INDEX IF NOT EXISTS buffer_depleted ON buffer (depleted)',
+]
+
+upsert_sql = 'INSERT OR REPLACE INTO buffer (key, %s, depleted) ' \
+    'VALUES (?, %s, ?)' % (', '.join(fields), ', '.join('?' * len(fields)))
+select_sql = 'SELECT key, %s FROM buffer' % ', '.join(fields)
+
+
+class SQLiteStore(object):
+    """
+    Persists named timed buffers in an SQLite database, indexed by
+    their expiry and their predicted depletion time, so that they can
+    be queried without loading all of them.
+
+    Keys must be strings.
+    """
+
+    def __init__(self, path=':memory:', factory=TimedBuffer):
+        """
+        path - the path to the database file.  Default: in memory.
+        factory - the `TimedBuffer` class to load the buffers as.
+                  Default: TimedBuffer
+        """
+
+        self.factory = factory
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            for statement in schema:
+                self.connection.execute(statement)
+
+    def close(self):
+        self.connection.close()
+
+    def _row(self, key, buffer):
+        return (key,) + tuple(buffer.getState()) + (
+            buffer.getDepletedTime(),)
+
+    def _load(self, row):
+        # SQLite has no booleans, so freeze comes back as an integer.
+        return self.factory.fromState(row[1:-1] + (bool(row[-1]),))
+
+    def _iter(self, sql, args=()):
+        # rows are fetched from the cursor as they are iterated.
+        for row in self.connection.execute(sql, args):
+            yield row[0], self._load(row)
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM buffer').fetchone()[0]
+
+    def __contains__(self, key):
+        return self.connection.execute(
+            'SELECT 1 FROM buffer WHERE key = ?', (key,)).fetchone() \
+            is not None
+
+    def __getitem__(self, key):
+        row = self.connection.execute(select_sql + ' WHERE key = ?',
+            (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._load(row)
+
+    def keys(self):
+        for row in self.connection.execute('SELECT key FROM buffer'):
+            yield row[0]
+
+    def upsert(self, key, buffer):
+        """
+        Store the buffer under key, replacing any existing one.
+        """
+
+        self.upsertMany([(key, buffer)])
+
+    def upsertMany(self, items):
+        """
+        Store an iterable of key, buffer pairs in a single transaction.
+        """
+
+        with self.connection:
+            self.connection.executemany(upsert_sql,
+                (self._row(key, buffer) for key, buffer in items))
+
+    def remove(self, key):
+        with self.connection:
+            cursor = self.connection.execute(
+                'DELETE FROM buffer WHERE key = ?', (key,))
+        if not cursor.rowcount:
+            raise KeyError(key)
+
+    def iterDue(self, timestamp):
+        """
+        Generate the key and buffer of every buffer that will have a
+        cycle elapsed by timestamp, i.e. those with an expiry before it
+        and not frozen, in order of expiry.
+        """
+
+        return self._iter(select_sql + ' WHERE expiry < ? AND NOT freeze '
+            'ORDER BY expiry', (timestamp,))
+
+    def iterDepleted(self, start=None, end=None):
+        """
+        Generate the key and buffer of every buffer with the predicted
+        depletion time between start and end (inclusive), in order of
+        that time.
+        """
+
+        clauses = ['depleted IS NOT NULL']
+        args = []
+        if start is not None:
+            clauses.append('depleted >= ?')
+            args.append(start)
+        if end is not None:
+            clauses.append('depleted <= ?')
+            args.append(end)
+        return self._iter(select_sql + ' WHERE %s ORDER BY depleted' %
+            ' AND '.join(clauses), args)
@@ -0,0 +1,6 @@
+from mtj.multimer.buffer import TimedBuffer
+
+qSilo = lambda value, full: TimedBuffer(delta=100, period=3600, timestamp=0,
+    delta_min=0, delta_factor=1, value=value, full=full)
+qLPos = lambda value: TimedBuffer(delta=40, period=3600, timestamp=0,
+    delta_min=1, delta_factor=-1, value=value, full=28000)
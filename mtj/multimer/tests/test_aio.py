@@ -0,0 +1,136 @@
+from unittest import TestCase, TestSuite, makeSuite, skipIf
+
+try:
+    import asyncio
+    from mtj.multimer.aio import AsyncTracker
+except (ImportError, SyntaxError):  # pragma: no cover
+    AsyncTracker = None
+
+from mtj.multimer import clock
+from mtj.multimer.tests import qLPos, qSilo
+
+
+class FakeClock(clock.FakeClock):
+    """
+    A clock that only moves when slept on.
+    """
+
+    def __init__(self, now=0):
+        super(FakeClock, self).__init__(now)
+        self.slept = []
+
+    def sleep(self, delay):
+        self.slept.append(delay)
+        self.advance(delay)
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(None)
+        return future
+
+
+class AsyncIterator(object):
+    """
+    An asynchronous iterator over the items of a sequence.
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        if not self.items:
+            raise StopAsyncIteration
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(self.items.pop(0))
+        return future
+
+
+@skipIf(AsyncTracker is None, 'asyncio is not available')
+class TestAsyncTracker(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.clock = FakeClock()
+        self.tracker = AsyncTracker(clock=self.clock, sleep=self.clock.sleep)
+        self.tracker.add('silo', qSilo(59850, 60000))
+        self.tracker.add('pos', qLPos(100))
+
+    def tearDown(self):
+        self.tracker.stop()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
+
+    def run_until(self, awaitable):
+        runner = self.loop.create_task(self.tracker.run())
+        result = self.loop.run_until_complete(
+            asyncio.wait_for(awaitable, 5))
+        self.tracker.stop()
+        self.loop.run_until_complete(runner)
+        return result
+
+    def test_0000_wait_for(self):
+        event = self.run_until(self.tracker.waitFor('silo', 'depleted'))
+        self.assertEqual(event.timestamp, 7200)
+        self.assertEqual(event.key, 'silo')
+        self.assertEqual(event.buffer.value, 60000)
+        self.assertEqual(self.clock.slept[:2], [3600, 3600])
+
+    def test_0001_wait_for_any(self):
+        event = self.run_until(self.tracker.waitFor('pos'))
+        self.assertEqual((event.timestamp, event.kind), (3600, 'cycle'))
+        self.assertEqual(event.buffer.value, 60)
+
+    def test_0010_events(self):
+        events = self.tracker.events()
+        results = []
+        for i in range(4):
+            event = self.run_until(events.__anext__())
+            results.append((event.timestamp, event.key, event.kind))
+        self.assertEqual(results, [
+            (3600, 'silo', 'cycle'),
+            (3600, 'pos', 'cycle'),
+            (7200, 'silo', 'depleted'),
+            (7200, 'pos', 'cycle'),
+        ])
+        self.loop.run_until_complete(events.aclose())
+        self.assertEqual(self.tracker._queues, [])
+
+    def test_0011_events_before_iterating(self):
+        events = self.tracker.events()
+        self.clock.now = 3600
+        self.tracker.popDue()
+        event = self.loop.run_until_complete(events.__anext__())
+        self.assertEqual((event.timestamp, event.key), (3600, 'silo'))
+        event = self.loop.run_until_complete(events.__anext__())
+        self.assertEqual((event.timestamp, event.key), (3600, 'pos'))
+        events.close()
+        self.assertEqual(self.tracker._queues, [])
+        self.assertRaises(StopAsyncIteration, self.loop.run_until_complete,
+            events.__anext__())
+
+    def test_0020_wake_on_change(self):
+        self.tracker.remove('silo')
+        self.tracker.remove('pos')
+        self.loop.call_soon(self.tracker.add, 'pos', qLPos(100))
+        event = self.run_until(self.tracker.waitFor('pos', 'depleted'))
+        self.assertEqual(event.timestamp, 10800)
+        self.assertEqual(event.buffer.value, 20)
+
+    def test_0030_reconcile(self):
+        observations = AsyncIterator([
+            (1000, 'pos', 100), (4000, 'pos', 80), (4100, 'pos', 80)])
+        waiting = self.loop.create_task(self.tracker.waitFor('pos'))
+        stream = self.tracker.reconcile(observations)
+        event = self.loop.run_until_complete(stream.__anext__())
+        self.assertEqual((event.timestamp, event.kind, event.buffer.value),
+            (4000, 'observed', 80))
+        self.assertEqual(self.loop.run_until_complete(waiting), event)
+        self.assertEqual(self.tracker.tracker['pos'].value, 80)
+        self.assertRaises(StopAsyncIteration,
+            self.loop.run_until_complete, stream.__anext__())
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestAsyncTracker))
+    return suite
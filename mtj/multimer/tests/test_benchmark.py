@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest import TestCase, TestSuite, makeSuite
+
+try:
+    from StringIO import StringIO
+except ImportError:  # pragma: no cover
+    from io import StringIO
+
+from mtj.multimer import benchmark
+
+
+class TestBenchmark(TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.stdout = sys.stdout
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+        shutil.rmtree(self.tempdir)
+
+    def test_0000_flatten(self):
+        self.assertEqual(benchmark.flatten({'a': {'b': 1, 'c': {'d': 2}},
+            'e': 3}), {'a.b': 1, 'a.c.d': 2, 'e': 3})
+
+    def test_0001_compare(self):
+        ratios, regressions = benchmark.compare(
+            {'a': {'b': 2.0, 'c': 1.1}, 'd': 1.0, 'e': 1.0},
+            {'a': {'b': 1.0, 'c': 1.0}, 'd': 4.0, 'e': 0})
+        self.assertEqual(ratios['a.b'], 2.0)
+        self.assertEqual(ratios['d'], 0.25)
+        self.assertFalse('e' in ratios)
+        self.assertEqual(regressions, ['a.b'])
+
+    def test_0002_subclasses(self):
+        cls = benchmark.makePredicates(3)
+        self.assertEqual(len(cls.getFreezePredicates()), 4)
+        cls = benchmark.makeAttributes(3)
+        self.assertEqual(cls.attribute2, 2)
+        self.assertEqual(len(cls.getFreezePredicates()), 1)
+
+    def test_0010_main(self):
+        path = os.path.join(self.tempdir, 'baseline.json')
+        args = ['--calls', '10', '--bench', 'chain', '--bench',
+            'predicates']
+        self.assertEqual(benchmark.main(args + ['--save', path]), 0)
+        with open(path) as fd:
+            baseline = json.load(fd)
+        self.assertEqual(sorted(baseline), ['chain', 'predicates'])
+        self.assertEqual(sorted(baseline['predicates']), ['0', '10', '100'])
+
+        # everything is infinitely slower than a baseline of nothing.
+        baseline['chain'] = 1e-12
+        with open(path, 'w') as fd:
+            json.dump(baseline, fd)
+        sys.stdout = StringIO()
+        self.assertEqual(benchmark.main(args + ['--baseline', path,
+            '--tolerance', '1000']), 1)
+        output = json.loads(sys.stdout.getvalue())
+        self.assertEqual(output['regressions'], ['chain'])
+        self.assertEqual(sorted(output['results']), ['chain', 'predicates'])
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestBenchmark))
+    return suite
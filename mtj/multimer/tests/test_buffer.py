@@ -1,13 +1,13 @@
+import copy
+import pickle
 from unittest import TestCase, TestSuite, makeSuite
 
-from mtj.multimer.buffer import Buffer, TimedBuffer
+from mtj.multimer.buffer import Buffer, TimedBuffer, freezePredicate
+from mtj.multimer.buffer import TimedBufferState
+from mtj.multimer.tests import qLPos, qSilo
 
-qSilo = lambda value, full: TimedBuffer(delta=100, period=3600, timestamp=0,
-    delta_min=0, delta_factor=1, value=value, full=full)
 qSiloDM = lambda value, full: TimedBuffer(delta=100, period=3600, timestamp=0,
     delta_min=0.01, delta_factor=1, value=value, full=full)
-qLPos = lambda value: TimedBuffer(delta=40, period=3600, timestamp=0,
-    delta_min=1, delta_factor=-1, value=value, full=28000)
 qLPosS = lambda value: TimedBuffer(delta=30, period=3600, timestamp=0,
     delta_min=1, delta_factor=-1, value=value, full=28000)
 
@@ -262,6 +262,217 @@ class TestTimedBuffer(TestCase):
         self.assertFalse(s2.freeze)
         self.assertEqual(s2.value, 0)
 
+    def test_0600_freeze_predicates(self):
+        calls = []
+
+        class CheapBuffer(TimedBuffer):
+            @freezePredicate(order=-1)
+            def isTooExpensive(self, timestamp):
+                calls.append('isTooExpensive')
+                return timestamp > 7200
+
+            def freeze_Manual(self, timestamp):
+                calls.append('freeze_Manual')
+                return False
+
+            freezeNotCallable = None
+
+        self.assertEqual(TimedBuffer.getFreezePredicates(),
+            ('freeze_CyclesDepleted',))
+        self.assertEqual(CheapBuffer.getFreezePredicates(),
+            ('isTooExpensive', 'freeze_Manual', 'freeze_CyclesDepleted'))
+        # registry is per class.
+        self.assertEqual(TimedBuffer.getFreezePredicates(),
+            ('freeze_CyclesDepleted',))
+
+        buff = CheapBuffer(delta=100, period=3600, timestamp=0,
+            value=0, full=60000)
+        self.assertFalse(buff.isToBeFrozen(3600))
+        self.assertEqual(calls, ['isTooExpensive', 'freeze_Manual'])
+
+        calls[:] = []
+        self.assertTrue(buff.isToBeFrozen(7201))
+        # short circuited.
+        self.assertEqual(calls, ['isTooExpensive'])
+        self.bufferChecker(buff, 7201, 200, True)
+
+        calls[:] = []
+        self.assertTrue(buff.isToBeFrozen(3600, True))
+        self.assertEqual(calls, [])
+
+    def test_0601_freeze_prefix(self):
+
+        class PrefixBuffer(TimedBuffer):
+            def __init__(self, *a, **kw):
+                super(PrefixBuffer, self).__init__(*a, **kw)
+                self.freezePrefix = 'halt'
+
+            def halt_Always(self, timestamp):
+                return True
+
+        buff = PrefixBuffer(timestamp=0)
+        self.assertTrue(buff.isToBeFrozen(0))
+        self.assertEqual(PrefixBuffer.getFreezePredicates('halt'),
+            ('halt_Always',))
+        self.assertEqual(PrefixBuffer.getFreezePredicates(),
+            ('freeze_CyclesDepleted',))
+
+    def test_0602_freeze_prefix_depletion(self):
+        # depletion is not a predicate for another prefix.
+
+        class HaltBuffer(TimedBuffer):
+            freezePrefix = 'halt'
+
+        class OptInBuffer(HaltBuffer):
+            @freezePredicate(order=1)
+            def isDepleted(self, timestamp):
+                return self.isCyclesDepleted(timestamp)
+
+        kw = dict(delta=40, period=3600, timestamp=0, delta_min=1,
+            delta_factor=-1, value=100, full=28000)
+        buff = HaltBuffer(**kw)
+        self.assertEqual(HaltBuffer.getFreezePredicates(), ())
+        self.assertFalse(buff.isToBeFrozen(20000))
+        self.assertFalse(buff.getCurrent(20000).freeze)
+        self.assertEqual(list(buff.iterSamples([7200, 20000])),
+            [(7200, 20, False), (20000, 20, False)])
+
+        buff = OptInBuffer(**kw)
+        self.assertEqual(OptInBuffer.getFreezePredicates(), ('isDepleted',))
+        self.assertTrue(buff.getCurrent(20000).freeze)
+        self.assertEqual(list(buff.iterSamples([7200, 20000])),
+            [(7200, 20, False), (20000, 20, True)])
+
+    def test_0700_event_times(self):
+        # no remainder, so filled at the last cycle.
+        self.assertEqual(self.zero_silo.getCycleTime(1), 3600)
+        self.assertEqual(self.zero_silo.getLimitTime(), 2160000)
+        self.assertEqual(self.zero_silo.getRemainderTime(), None)
+        self.assertEqual(self.zero_silo.getDepletedTime(), 2163600)
+        self.assertEqual(self.zero_silo.getFreezeTime(), 2163600)
+
+        self.assertEqual(self.part_silo.getLimitTime(), 2116800)
+        self.assertEqual(self.part_silo.getRemainderTime(), 2116800)
+        self.assertEqual(self.part_silo.getDepletedTime(), 2116800)
+
+        # remainder smaller than delta_min is never applied.
+        self.assertEqual(self.part_pos.getLimitTime(), 108000)
+        self.assertEqual(self.part_pos.getRemainderTime(), None)
+        self.assertEqual(self.part_pos.getFreezeTime(), 111600)
+
+        self.assertEqual(self.full_silo.getLimitTime(), 0)
+        self.assertEqual(self.full_silo.getDepletedTime(), 3600)
+
+    def test_0701_event_times_consistent(self):
+        buffers = [self.zero_silo, self.part_silo, self.part_silodm,
+            self.full_pos, self.part_pos, self.zero_pos,
+            TimedBuffer(delta=40, period=3600, timestamp=0,
+                delta_min=0.325, delta_factor=-1, value=140, full=1000)]
+        for buff in buffers:
+            limit = buff.getLimitTime()
+            depleted = buff.getDepletedTime()
+            final = buff.getCurrent(limit).value
+            if limit > buff.timestamp:
+                self.assertNotEqual(buff.getCurrent(limit - 1).value, final)
+            self.assertEqual(buff.getCurrent(depleted + 86400).value, final)
+            self.assertFalse(buff.isCyclesDepleted(depleted - 1))
+            self.assertTrue(buff.isCyclesDepleted(depleted))
+            self.assertFalse(buff.isToBeFrozen(buff.getFreezeTime() - 1))
+            self.assertTrue(buff.isToBeFrozen(buff.getFreezeTime()))
+
+    def test_0702_event_times_frozen(self):
+        freeze = TimedBuffer(delta=100, period=3600, timestamp=10,
+            value=34567, full=75000, freeze=True)
+        self.assertEqual(freeze.getCycleTime(1), None)
+        self.assertEqual(freeze.getDepletedTime(), None)
+        self.assertEqual(freeze.getLimitTime(), None)
+        self.assertEqual(freeze.getFreezeTime(), 10)
+
+    def test_0800_state(self):
+        state = self.part_silodm.getState()
+        self.assertTrue(isinstance(state, TimedBufferState))
+        self.assertEqual(state.value, 1234)
+        self.assertEqual(state.delta_min, 0.01)
+        self.assertRaises(AttributeError, setattr, state, 'value', 1)
+        buff = TimedBuffer.fromState(state)
+        self.assertEqual(buff.getState(), state)
+        self.bufferChecker(buff, 2116800, 60000, True)
+
+    def test_0801_slots(self):
+        self.assertFalse(hasattr(self.part_silo, '__dict__'))
+        self.assertFalse(hasattr(self.part_silo.getCurrent(3600),
+            '__dict__'))
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            buff = pickle.loads(pickle.dumps(self.part_silo, protocol))
+            self.assertEqual(buff.getState(), self.part_silo.getState())
+
+    def test_0810_subclass_current(self):
+
+        class PlainBuffer(TimedBuffer):
+            pass
+
+        class NamedBuffer(TimedBuffer):
+            def __init__(self, name=None, *a, **kw):
+                super(NamedBuffer, self).__init__(*a, **kw)
+                self.name = name
+
+            def getCurrent(self, timestamp=None, freeze=None, *a, **kw):
+                return super(NamedBuffer, self).getCurrent(
+                    timestamp, freeze, name=self.name, *a, **kw)
+
+        plain = PlainBuffer(delta=100, period=3600, timestamp=0, value=0,
+            full=60000).getCurrent(7200)
+        self.assertTrue(isinstance(plain, PlainBuffer))
+        self.assertEqual(plain.value, 200)
+
+        named = NamedBuffer(name='silo', delta=100, period=3600,
+            timestamp=0, value=0, full=60000)
+        current = named.getCurrent(7200)
+        self.assertTrue(isinstance(current, NamedBuffer))
+        self.assertEqual(current.name, 'silo')
+        self.assertEqual(current.value, 200)
+        current = copy.deepcopy(current)
+        self.assertEqual(current.name, 'silo')
+        self.assertEqual(current.expiry, 10799)
+
+    def test_0900_samples(self):
+        buffers = [self.zero_silo, self.part_silo, self.full_silo,
+            self.part_silodm, self.part_pos, self.zero_pos,
+            TimedBuffer(delta=40, period=3600, timestamp=0,
+                delta_min=0.325, delta_factor=-1, value=140, full=1000),
+            TimedBuffer(delta=100, period=3600, timestamp=0, value=34567,
+                full=75000, freeze=True)]
+        timestamps = list(range(-3600, 2200000, 1800)) + [2116799, 2116800]
+        timestamps.sort()
+        for buff in buffers:
+            samples = list(buff.iterSamples(timestamps))
+            self.assertEqual(len(samples), len(timestamps))
+            for timestamp, value, freeze in samples:
+                current = buff.getCurrent(timestamp)
+                self.assertEqual(value, current.value)
+                self.assertEqual(freeze, current.freeze)
+
+    def test_0901_breakpoints(self):
+        samples = list(self.part_pos.iterSamples(range(0, 200000, 600),
+            breakpoints=True))
+        self.assertEqual(len(samples), 32)
+        self.assertEqual(samples[:3], [(0, 1234, False),
+            (3600, 1194, False), (7200, 1154, False)])
+        self.assertEqual(samples[-2:], [(108000, 34, False),
+            (111600, 34, True)])
+
+    def test_0902_samples_freeze_predicate(self):
+
+        class Halting(TimedBuffer):
+            def freeze_Halt(self, timestamp):
+                return timestamp >= 5000
+
+        buff = Halting(delta=100, period=3600, timestamp=0, value=0,
+            full=60000)
+        self.assertEqual(list(buff.iterSamples([3600, 4999, 5000, 7200],
+            breakpoints=True)), [(3600, 100, False), (5000, 100, True),
+            (7200, 200, True)])
+
     def test_1000_abnormal_setup(self):
         weird1 = TimedBuffer(delta=40, period=3600, timestamp=0,
             delta_min=0.325, delta_factor=-1, value=140, full=1000)
@@ -0,0 +1,81 @@
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.cache import CurrentCache
+from mtj.multimer.tracker import Tracker
+from mtj.multimer.tests import qSilo
+
+
+class TestCurrentCache(TestCase):
+
+    def setUp(self):
+        self.cache = CurrentCache(size=4)
+        self.silo = qSilo(1234, 60000)
+
+    def tearDown(self):
+        pass
+
+    def test_0000_hit(self):
+        first = self.cache.getCurrent(self.silo, 3600)
+        self.assertEqual(first.value, 1334)
+        self.assertEqual(first.timestamp, 3600)
+        second = self.cache.getCurrent(self.silo, 7199)
+        self.assertTrue(second is first)
+        third = self.cache.getCurrent(self.silo, 7200)
+        self.assertEqual(third.value, 1434)
+        self.assertEqual(self.cache.getStats(), {
+            'size': 2,
+            'maxsize': 4,
+            'hits': 1,
+            'misses': 2,
+            'evictions': 0,
+            'hit_rate': 1.0 / 3,
+        })
+
+    def test_0001_matches_uncached(self):
+        buffers = [self.silo, qSilo(59950, 60000), qSilo(0, 60000),
+            TimedBuffer(delta=40, period=3600, timestamp=0, delta_min=0.325,
+                delta_factor=-1, value=140, full=1000)]
+        for buff in buffers:
+            for timestamp in (0, 1, 3599, 3600, 3601, 7200, 14400, 22400):
+                expected = buff.getCurrent(timestamp)
+                result = self.cache.getCurrent(buff, timestamp)
+                self.assertEqual(result.value, expected.value)
+                self.assertEqual(result.expiry, expected.expiry)
+                self.assertEqual(result.freeze, expected.freeze)
+
+    def test_0002_bypass(self):
+        frozen = self.cache.getCurrent(self.silo, 3600, True)
+        self.assertTrue(frozen.freeze)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.getStats()['hit_rate'], 0)
+
+    def test_0010_eviction(self):
+        for timestamp in range(0, 3600 * 6, 3600):
+            self.cache.getCurrent(self.silo, timestamp)
+        self.assertEqual(len(self.cache), 4)
+        self.assertEqual(self.cache.evictions, 2)
+        # most recent ones are kept.
+        self.cache.getCurrent(self.silo, 18000)
+        self.assertEqual(self.cache.hits, 1)
+        self.cache.getCurrent(self.silo, 0)
+        self.assertEqual(self.cache.misses, 7)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_0100_tracker(self):
+        tracker = Tracker(cache=self.cache)
+        tracker.add('silo', self.silo)
+        self.assertEqual(tracker.getCurrent('silo', 3600).value, 1334)
+        self.assertEqual(tracker.getCurrent('silo', 3700).value, 1334)
+        self.assertEqual(self.cache.hits, 1)
+        # not advanced.
+        self.assertTrue(tracker['silo'] is self.silo)
+        tracker.update('silo', qSilo(0, 60000))
+        self.assertEqual(tracker.getCurrent('silo', 3700).value, 100)
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestCurrentCache))
+    return suite
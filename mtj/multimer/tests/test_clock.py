@@ -0,0 +1,140 @@
+import threading
+import time
+from unittest import TestCase, TestSuite, makeSuite, skipIf
+
+try:
+    import asyncio
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    ContextVar = None
+
+from mtj.multimer import clock
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.cache import CurrentCache
+from mtj.multimer.tracker import Tracker
+from mtj.multimer.tests import qLPos
+
+qLPosNow = lambda value: TimedBuffer(delta=40, period=3600, delta_min=1,
+    delta_factor=-1, value=value, full=28000)
+
+
+class CountingClock(clock.FakeClock):
+
+    def __init__(self, now=0):
+        super(CountingClock, self).__init__(now)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.now
+
+
+class Reading(object):
+    """
+    Awaitable that reads the clock before and after yielding to the
+    other tasks, while pinned to timestamp if specified.
+    """
+
+    def __init__(self, timestamp=None):
+        self.timestamp = timestamp
+        self.seen = []
+
+    def read(self):
+        self.seen.append(clock.now())
+        # give the other tasks a turn.
+        yield
+        self.seen.append(clock.now())
+
+    def __await__(self):
+        if self.timestamp is None:
+            return self.read()
+        return self.pinned()
+
+    def pinned(self):
+        with clock.pinned(self.timestamp):
+            for step in self.read():
+                yield step
+
+
+class TestClock(TestCase):
+
+    def setUp(self):
+        self.clock = clock.FakeClock(3600)
+        self.previous = clock.setClock(self.clock)
+
+    def tearDown(self):
+        clock.setClock(self.previous)
+
+    def test_0000_system(self):
+        clock.setClock()
+        self.assertTrue(isinstance(clock.getClock(), clock.SystemClock))
+        self.assertTrue(abs(clock.now() - time.time()) < 2)
+
+    def test_0001_fake(self):
+        self.assertEqual(clock.now(), 3600)
+        buffer = qLPosNow(1000)
+        self.assertEqual(buffer.timestamp, 3600)
+        self.assertEqual(self.clock.advance(3600), 7200)
+        self.assertEqual(buffer.getCurrent().value, 960)
+        self.assertEqual(buffer.getDeltaTime(), 1)
+        self.assertFalse(buffer.isToBeFrozen())
+
+    def test_0002_tracker(self):
+        tracker = Tracker(cache=CurrentCache())
+        tracker.add('pos', qLPosNow(1000))
+        self.clock.advance(3600)
+        self.assertEqual(tracker.getCurrent('pos').value, 960)
+        self.assertEqual([event.key for event in tracker.popDue()], ['pos'])
+        self.assertEqual(tracker['pos'].timestamp, 7200)
+
+    def test_0010_pinned(self):
+        counting = CountingClock(7200)
+        clock.setClock(counting)
+        buffers = [qLPos(value) for value in (100, 1000)]
+        counting.calls = 0
+        with clock.pinned() as timestamp:
+            counting.now = 10800
+            values = [buffer.getCurrent().value for buffer in buffers]
+            self.assertEqual(clock.now(), 7200)
+        self.assertEqual(timestamp, 7200)
+        self.assertEqual(counting.calls, 1)
+        self.assertEqual(values, [20, 920])
+        self.assertEqual(clock.now(), 10800)
+
+    def test_0011_pinned_nested(self):
+        with clock.pinned(100):
+            with clock.pinned(200) as timestamp:
+                self.assertEqual(timestamp, 200)
+                self.assertEqual(clock.now(), 200)
+            self.assertEqual(clock.now(), 100)
+        self.assertEqual(clock.now(), 3600)
+
+    def test_0012_pinned_thread(self):
+        seen = []
+        with clock.pinned(100):
+            thread = threading.Thread(
+                target=lambda: seen.append(clock.now()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [3600])
+
+    @skipIf(ContextVar is None, 'requires contextvars')
+    def test_0013_pinned_tasks(self):
+        pinning = Reading(5)
+        reading = Reading()
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(asyncio.gather(
+                asyncio.ensure_future(pinning, loop=loop),
+                asyncio.ensure_future(reading, loop=loop)))
+        finally:
+            loop.close()
+        self.assertEqual(pinning.seen, [5, 5])
+        self.assertEqual(reading.seen, [3600, 3600])
+        self.assertEqual(clock.now(), 3600)
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestClock))
+    return suite
@@ -0,0 +1,121 @@
+from unittest import TestCase, TestSuite, makeSuite, skipIf
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.columnar import TimedBufferArray
+
+
+def sample_buffers():
+    return [
+        TimedBuffer(delta=100, period=3600, timestamp=0,
+            delta_min=0, delta_factor=1, value=1234, full=60000),
+        TimedBuffer(delta=100, period=3600, timestamp=0,
+            delta_min=0.01, delta_factor=1, value=0, full=60000),
+        TimedBuffer(delta=100, period=3600, timestamp=0,
+            delta_min=0.01, delta_factor=1, value=60000, full=60000),
+        TimedBuffer(delta=40, period=3600, timestamp=0,
+            delta_min=1, delta_factor=-1, value=1234, full=28000),
+        TimedBuffer(delta=40, period=3600, timestamp=0,
+            delta_min=0.325, delta_factor=-1, value=140, full=1000),
+        TimedBuffer(delta=100, period=3600, timestamp=0,
+            delta_min=(1./3), delta_factor=1, value=115, full=1000),
+        TimedBuffer(delta=100, period=3600, timestamp=0,
+            delta_min=(1./3), delta_factor=-1, value=115, full=1000,
+            empty=-180),
+        TimedBuffer(delta=100, period=1800, timestamp=0,
+            delta_min=0.01, delta_factor=1, value=34567, full=75000,
+            freeze=True),
+        TimedBuffer(delta=7, period=60, timestamp=100, expiry=130,
+            delta_min=0.5, delta_factor=-1, value=100, full=100),
+    ]
+
+timestamps = [0, 1, 3599, 3600, 3601, 7200, 14399, 14400, 32400,
+    108000, 111600, 2116800, 2520000, 2523600]
+
+
+@skipIf(numpy is None, 'numpy is not available')
+class TestTimedBufferArray(TestCase):
+
+    def setUp(self):
+        self.buffers = sample_buffers()
+        self.array = TimedBufferArray.fromBuffers(self.buffers)
+
+    def tearDown(self):
+        pass
+
+    def assertMatches(self, buffers, array):
+        self.assertEqual(len(buffers), len(array))
+        for buff, row in zip(buffers, array):
+            for name in TimedBufferArray.fields:
+                self.assertEqual(getattr(buff, name), getattr(row, name))
+
+    def test_0000_base(self):
+        self.assertEqual(len(self.array), len(self.buffers))
+        self.assertMatches(self.buffers, self.array)
+
+    def test_0001_assertions(self):
+        buffers = self.buffers[:1]
+        kw = dict((name, [getattr(buffers[0], name)])
+            for name in TimedBufferArray.fields)
+        kw['period'] = [0]
+        self.assertRaises(AssertionError, TimedBufferArray, **kw)
+        kw['period'] = [1, 2]
+        self.assertRaises(AssertionError, TimedBufferArray, **kw)
+
+    def test_0010_cycles(self):
+        for timestamp in timestamps:
+            self.assertEqual(
+                list(self.array.getCyclesElapsed(timestamp)),
+                [b.getCyclesElapsed(timestamp) for b in self.buffers])
+            self.assertEqual(
+                list(self.array.isCyclesDepleted(timestamp)),
+                [b.isCyclesDepleted(timestamp) for b in self.buffers])
+        self.assertEqual(list(self.array.getCyclesAvailable()),
+            [b.getCyclesAvailable() for b in self.buffers])
+        self.assertEqual(list(self.array.getCyclesPossible()),
+            [b.getCyclesPossible() for b in self.buffers])
+
+    def test_0020_to_be_frozen(self):
+        for timestamp in timestamps:
+            for freeze in (None, True, False):
+                self.assertEqual(
+                    list(self.array.isToBeFrozen(timestamp, freeze)),
+                    [b.isToBeFrozen(timestamp, freeze)
+                        for b in self.buffers])
+
+    def test_0100_get_current(self):
+        for timestamp in timestamps:
+            for freeze in (None, True, False):
+                self.assertMatches(
+                    [b.getCurrent(timestamp, freeze) for b in self.buffers],
+                    self.array.getCurrent(timestamp, freeze))
+
+    def test_0110_get_current_chained(self):
+        buffers = self.buffers
+        array = self.array
+        for timestamp in timestamps:
+            buffers = [b.getCurrent(timestamp) for b in buffers]
+            array = array.getCurrent(timestamp)
+            self.assertMatches(buffers, array)
+
+    def test_0200_event_times(self):
+        names = ('getDepletedTime', 'getRemainderTime', 'getLimitTime',
+            'getFreezeTime')
+        for name in names:
+            times = getattr(self.array, name)()
+            self.assertEqual(times.tolist(),
+                [getattr(b, name)() for b in self.buffers])
+        self.assertEqual(self.array.getCycleTime(2).tolist(),
+            [b.getCycleTime(2) for b in self.buffers])
+        self.assertEqual(list(self.array.getRemainderValue()),
+            [b.getRemainderValue() for b in self.buffers])
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestTimedBufferArray))
+    return suite
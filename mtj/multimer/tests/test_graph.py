@@ -0,0 +1,90 @@
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.graph import BufferGraph
+
+qFuel = lambda value, delta=10: TimedBuffer(delta=delta, period=3600,
+    timestamp=0, delta_min=1, delta_factor=-1, value=value, full=28000)
+
+
+class TestBufferGraph(TestCase):
+
+    def setUp(self):
+        self.graph = BufferGraph()
+
+    def tearDown(self):
+        pass
+
+    def summary(self, events):
+        return [(e.timestamp, e.key, e.kind, e.buffer.value) for e in events]
+
+    def test_0000_base(self):
+        self.graph.add('fuel', qFuel(100))
+        self.assertEqual(len(self.graph), 1)
+        self.assertTrue('fuel' in self.graph)
+        self.assertEqual(self.graph['fuel'].value, 100)
+        self.assertRaises(KeyError, self.graph.link, 'fuel', 'nope')
+        self.assertRaises(KeyError, self.graph.link, 'nope', 'fuel')
+
+    def test_0010_tower(self):
+        # a tower stops once any of its fuels runs out.
+        self.graph.add('fuel1', qFuel(100))
+        self.graph.add('fuel2', qFuel(1000))
+        self.graph.add('fuel3', qFuel(1000, 20))
+        for source in ('fuel1', 'fuel2', 'fuel3'):
+            for target in ('fuel1', 'fuel2', 'fuel3'):
+                if source != target:
+                    self.graph.link(source, target)
+
+        self.assertEqual(self.graph.simulate(39599), [])
+        events = self.graph.simulate(86400 * 90)
+        self.assertEqual(self.summary(events), [
+            (39600, 'fuel1', 'depleted', 0),
+            (39600, 'fuel2', 'frozen', 900),
+            (39600, 'fuel3', 'frozen', 800),
+        ])
+        self.assertEqual(self.graph.getCurrent('fuel2', 86400 * 90).value,
+            900)
+        self.assertEqual(self.graph.tracker.peekNext(), None)
+
+    def test_0020_reaction(self):
+        # moves from source to target until either is exhausted.
+        self.graph.add('source', qFuel(1000, 100))
+        self.graph.add('target', TimedBuffer(delta=100, period=3600,
+            timestamp=0, value=0, full=500))
+        self.graph.link('source', 'target')
+        self.graph.link('target', 'source')
+        events = self.graph.simulate(86400)
+        self.assertEqual(self.summary(events), [
+            (21600, 'target', 'depleted', 500),
+            (21600, 'source', 'frozen', 500),
+        ])
+        # whatever the target gained was lost by the source.
+        self.assertEqual(events[1].buffer.timestamp, 21600)
+        self.assertEqual(self.graph.getCurrent('source', 86400).value, 500)
+
+    def test_0030_change(self):
+        # a custom action that doubles the consumption of the other.
+        def double(buff, timestamp):
+            current = buff.getCurrent(timestamp)
+            return TimedBuffer(delta=current.delta * 2,
+                period=current.period, timestamp=timestamp,
+                expiry=current.expiry, delta_factor=current.delta_factor,
+                delta_min=current.delta_min, value=current.value,
+                full=current.full, empty=current.empty)
+
+        self.graph.add('a', qFuel(100))
+        self.graph.add('b', qFuel(1000))
+        self.graph.link('a', 'b', double)
+        events = self.graph.simulate(86400 * 365)
+        self.assertEqual(self.summary(events), [
+            (39600, 'a', 'depleted', 0),
+            (39600, 'b', 'changed', 890),
+            (201600, 'b', 'depleted', 10),
+        ])
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestBufferGraph))
+    return suite
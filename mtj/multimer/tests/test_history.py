@@ -0,0 +1,76 @@
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.history import History, isSameState
+from mtj.multimer.tests import qLPos
+
+
+class TestHistory(TestCase):
+
+    def setUp(self):
+        self.history = History()
+        self.pos = qLPos(28000)
+
+    def tearDown(self):
+        pass
+
+    def test_0000_empty(self):
+        self.assertEqual(len(self.history), 0)
+        self.assertEqual(self.history.getState(0), None)
+        self.assertEqual(self.history.getCurrent(0), None)
+        self.assertEqual(self.history.compact(), 0)
+
+    def test_0001_same_state(self):
+        self.assertTrue(isSameState(self.pos, self.pos.getCurrent(1)))
+        self.assertFalse(isSameState(self.pos, self.pos.getCurrent(3600)))
+
+    def test_0010_point_in_time(self):
+        pos = self.pos.getCurrent(36000)
+        self.history.add(self.pos)
+        self.history.add(pos)
+        # the past is kept rather than clamped.
+        self.assertEqual(self.history.getCurrent(0).value, 28000)
+        self.assertEqual(self.history.getCurrent(7200).value, 27920)
+        self.assertEqual(self.history.getCurrent(36000).value, 27600)
+        self.assertTrue(self.history.getState(36001) is pos)
+        self.assertEqual(self.history.getCurrent(-1), None)
+
+    def test_0011_out_of_order(self):
+        # a refuel observed at 7200, recorded after a later state.
+        self.history.add(self.pos)
+        self.history.add(self.pos.getCurrent(36000))
+        refuelled = TimedBuffer(delta=40, period=3600, timestamp=7200,
+            delta_min=1, delta_factor=-1, value=28000, full=28000)
+        self.history.add(refuelled)
+        self.assertEqual([s.timestamp for s in self.history],
+            [0, 7200, 36000])
+        self.assertEqual(self.history.getCurrent(11000).value, 27960)
+        # a later record at the same timestamp wins.
+        self.history.add(refuelled.getCurrent(7200, True))
+        self.assertTrue(self.history.getCurrent(20000).freeze)
+
+    def test_0100_compact(self):
+        state = self.pos
+        self.history.add(state)
+        for timestamp in range(1800, 36000, 1800):
+            state = state.getCurrent(timestamp)
+            self.history.add(state)
+        self.history.add(qLPos(1000).getCurrent(36000))
+        self.assertEqual(len(self.history), 21)
+        self.assertEqual(self.history.compact(), 19)
+        self.assertEqual([s.timestamp for s in self.history], [0, 36000])
+        self.assertEqual(self.history.getCurrent(30000).value, 27680)
+        self.assertEqual(self.history.getCurrent(39600).value, 560)
+
+    def test_0101_limit(self):
+        history = History(limit=2)
+        for timestamp in (0, 3600, 7200):
+            history.add(self.pos.getCurrent(timestamp))
+        self.assertEqual([s.timestamp for s in history], [3600, 7200])
+        self.assertEqual(history.getCurrent(0), None)
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestHistory))
+    return suite
@@ -0,0 +1,84 @@
+import random
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.index import EventIndex
+from mtj.multimer.tests import qLPos, qSilo
+
+
+class TestEventIndex(TestCase):
+
+    def setUp(self):
+        self.index = EventIndex.fromBuffers([
+            ('silo', qSilo(1234, 60000)),
+            ('pos', qLPos(1234)),
+            ('empty', qLPos(0)),
+            ('frozen', TimedBuffer(timestamp=0, freeze=True)),
+            (('pos', 2), qLPos(1234)),
+        ])
+
+    def tearDown(self):
+        pass
+
+    def test_0000_base(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertTrue('pos' in self.index)
+        self.assertFalse('frozen' in self.index)
+        self.assertEqual(self.index.getTime('silo'), 2116800)
+        self.assertEqual(self.index.getTime('pos'), 108000)
+        self.assertRaises(KeyError, self.index.add, 'pos', qLPos(1))
+
+    def test_0010_range(self):
+        self.assertEqual(self.index.getRange(0, 86400), [(0, 'empty')])
+        self.assertEqual(self.index.getRange(86400, 108000),
+            [(108000, 'pos'), (108000, ('pos', 2))])
+        self.assertEqual(self.index.getRange(108001), [(2116800, 'silo')])
+        self.assertEqual(len(self.index.getRange()), 4)
+        self.assertEqual(self.index.getRange(1, 107999), [])
+
+    def test_0020_soonest(self):
+        self.assertEqual(self.index.getSoonest(2),
+            [(0, 'empty'), (108000, 'pos')])
+        self.assertEqual(self.index.getSoonest(2, 108001),
+            [(2116800, 'silo')])
+
+    def test_0030_update_remove(self):
+        self.index.update('pos', qLPos(28000))
+        self.assertEqual(self.index.getTime('pos'), 2520000)
+        self.index.remove('empty')
+        self.index.remove('missing')
+        self.assertEqual(self.index.getSoonest(10), [
+            (108000, ('pos', 2)), (2116800, 'silo'), (2520000, 'pos')])
+        self.index.update('silo', qSilo(0, 60000).getCurrent(0, True))
+        self.assertFalse('silo' in self.index)
+
+    def test_0040_depleted(self):
+        index = EventIndex(method='getDepletedTime')
+        index.add('pos', qLPos(1234))
+        self.assertEqual(index.getSoonest(1), [(111600, 'pos')])
+
+    def test_0100_random(self):
+        rng = random.Random(1)
+        reference = {}
+        for step in range(1000):
+            key = rng.randrange(50)
+            if rng.random() < 0.8:
+                buff = qLPos(rng.randrange(28000))
+                if key in self.index:
+                    self.index.update(key, buff)
+                else:
+                    self.index.add(key, buff)
+                reference[key] = buff.getLimitTime()
+            else:
+                self.index.remove(key)
+                reference.pop(key, None)
+        start, end = 500000, 1500000
+        self.assertEqual(sorted(k for t, k in self.index.getRange(start, end)
+                if isinstance(k, int)),
+            sorted(k for k, t in reference.items() if start <= t <= end))
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestEventIndex))
+    return suite
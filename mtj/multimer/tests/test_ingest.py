@@ -0,0 +1,104 @@
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.ingest import Observation, Reconciler, rebuildBuffer
+from mtj.multimer.schedule import ScheduledTimedBuffer
+from mtj.multimer.tracker import Tracker
+from mtj.multimer.tests import qLPos
+
+
+class TestReconciler(TestCase):
+
+    def setUp(self):
+        self.tracker = Tracker()
+        self.tracker.add('pos', qLPos(1000))
+        self.reconciler = Reconciler(self.tracker)
+
+    def tearDown(self):
+        pass
+
+    def test_0000_redundant(self):
+        self.assertEqual(self.reconciler.reconcile('pos', 1000, 100), None)
+        self.assertEqual(self.reconciler.reconcile('pos', 960, 3600), None)
+        self.assertEqual(self.tracker['pos'].timestamp, 0)
+        self.assertEqual(self.reconciler.getStats(),
+            {'observed': 2, 'dropped': 2, 'changed': 0})
+
+    def test_0001_diverged(self):
+        event = self.reconciler.reconcile('pos', 900, 4000)
+        self.assertEqual((event.timestamp, event.key, event.kind),
+            (4000, 'pos', 'observed'))
+        buffer = self.tracker['pos']
+        self.assertTrue(event.buffer is buffer)
+        self.assertEqual((buffer.value, buffer.timestamp, buffer.expiry),
+            (900, 4000, 7199))
+        self.assertEqual(self.tracker.peekNext(), (7200, 'pos', 'cycle'))
+        # now consistent with the observation.
+        self.assertEqual(self.reconciler.reconcile('pos', 860, 7200), None)
+        # older than the tracked state.
+        self.assertEqual(self.reconciler.reconcile('pos', 1, 3600), None)
+        self.assertEqual(self.reconciler.getStats(),
+            {'observed': 3, 'dropped': 2, 'changed': 1})
+
+    def test_0002_tolerance(self):
+        reconciler = Reconciler(self.tracker, tolerance=5)
+        self.assertEqual(reconciler.reconcile('pos', 995, 100), None)
+        self.assertNotEqual(reconciler.reconcile('pos', 994, 100), None)
+
+    def test_0003_invalid(self):
+        self.assertRaises(KeyError, self.reconciler.reconcile, 'x', 1, 1)
+        self.assertRaises(ValueError, self.reconciler.reconcile,
+            'pos', 30000, 100)
+        self.assertEqual(self.tracker['pos'].value, 1000)
+
+    def test_0004_depleted(self):
+        self.tracker.update('pos', qLPos(100))
+        self.tracker.popDue(20000)
+        self.assertTrue(self.tracker['pos'].freeze)
+        self.assertEqual(self.tracker.peekNext(), None)
+
+        event = self.reconciler.reconcile('pos', 28000, 20000)
+        buffer = event.buffer
+        self.assertFalse(buffer.freeze)
+        self.assertEqual((buffer.value, buffer.timestamp, buffer.expiry),
+            (28000, 20000, 23599))
+        self.assertEqual(self.tracker.peekNext(), (23600, 'pos', 'cycle'))
+        self.assertEqual(self.tracker.getCurrent('pos', 27200).value,
+            27920)
+
+    def test_0005_frozen(self):
+        # frozen with cycles to spare, such as an offline tower.
+        self.tracker.update('pos', qLPos(1000).getCurrent(0, True))
+        buffer = self.reconciler.reconcile('pos', 900, 20000).buffer
+        self.assertTrue(buffer.freeze)
+        self.assertEqual(self.tracker.getCurrent('pos', 100000).value, 900)
+
+    def test_0006_scheduled(self):
+        self.tracker.update('pos', ScheduledTimedBuffer(
+            schedule=[(36000, 80, 3600)], delta=40, period=3600,
+            timestamp=0, delta_min=1, delta_factor=-1, value=28000,
+            full=28000))
+        buffer = self.reconciler.reconcile('pos', 10000, 1000).buffer
+        self.assertEqual(buffer.getSchedule(), ((36000, 80, 3600),))
+        self.assertEqual(buffer.getCurrent(35999).value, 9640)
+        self.assertEqual(buffer.getCurrent(36000).value, 9600)
+        self.assertEqual(buffer.getCurrent(39600).value, 9520)
+        self.assertEqual(self.tracker.getCurrent('pos', 39600).value, 9520)
+
+    def test_0010_feed(self):
+        observations = (Observation(t, 'pos', v) for t, v in [
+            (100, 1000), (200, 990), (300, 990), (3600, 950), (3700, 950)])
+        events = self.reconciler.feed(observations)
+        self.assertEqual([(e.timestamp, e.buffer.value) for e in events],
+            [(200, 990)])
+
+    def test_0020_rebuild(self):
+        projected = qLPos(1000).getCurrent(100)
+        buffer = rebuildBuffer(projected, 10, 200)
+        self.assertEqual((buffer.value, buffer.timestamp), (10, 200))
+        self.assertEqual(projected.value, 1000)
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestReconciler))
+    return suite
@@ -0,0 +1,101 @@
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.cache import CurrentCache
+from mtj.multimer.instrument import Instrumentation
+from mtj.multimer.tests import qLPos
+
+
+class Offline(TimedBuffer):
+
+    def freeze_Offline(self, timestamp):
+        return timestamp > 86400
+
+
+class TestInstrumentation(TestCase):
+
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+
+    def tearDown(self):
+        self.instrumentation.uninstall()
+
+    def test_0000_counts(self):
+        self.instrumentation.install()
+        buffer = qLPos(100)
+        buffer.getCurrent(3600)
+        buffer.getCurrent(20000)
+        stats = self.instrumentation.getStats()
+        self.assertEqual(stats['calls'], {
+            'TimedBuffer.getCurrent': 2,
+            'TimedBuffer.isToBeFrozen': 2,
+            'TimedBuffer.freeze_CyclesDepleted': 2,
+        })
+        self.assertEqual(stats['triggers'],
+            {'TimedBuffer.freeze_CyclesDepleted': 1})
+        self.assertTrue(stats['elapsed']['TimedBuffer.getCurrent'] >=
+            stats['elapsed']['TimedBuffer.isToBeFrozen'])
+
+    def test_0001_uninstall(self):
+        getCurrent = TimedBuffer.__dict__['getCurrent']
+        with self.instrumentation as instrumentation:
+            instrumentation.install()
+            self.assertFalse(TimedBuffer.__dict__['getCurrent'] is
+                getCurrent)
+        self.assertTrue(TimedBuffer.__dict__['getCurrent'] is getCurrent)
+        qLPos(100).getCurrent(3600)
+        self.assertEqual(self.instrumentation.getStats()['calls'], {})
+
+    def test_0002_subclass(self):
+        self.instrumentation.install(TimedBuffer)
+        self.instrumentation.install(Offline)
+        buffer = Offline(delta=40, period=3600, timestamp=0, delta_min=1,
+            delta_factor=-1, value=28000, full=28000)
+        self.assertEqual(buffer.getFreezePredicates(),
+            ('freeze_Offline', 'freeze_CyclesDepleted'))
+        self.assertTrue(buffer.getCurrent(90000).freeze)
+        stats = self.instrumentation.getStats()
+        self.assertEqual(stats['calls'], {
+            'Offline.getCurrent': 1,
+            'Offline.isToBeFrozen': 1,
+            'Offline.freeze_Offline': 1,
+        })
+        self.assertEqual(stats['triggers'], {'Offline.freeze_Offline': 1})
+        self.instrumentation.uninstall()
+        self.assertFalse('getCurrent' in Offline.__dict__)
+        self.assertFalse(hasattr(Offline.__dict__['freeze_Offline'],
+            'original'))
+
+    def test_0003_callback(self):
+        calls = []
+        instrumentation = Instrumentation(
+            callback=lambda name, elapsed, result: calls.append(
+                (name, result)))
+        instrumentation.install()
+        try:
+            qLPos(100).isToBeFrozen(3600)
+        finally:
+            instrumentation.uninstall()
+        self.assertEqual(calls, [
+            ('TimedBuffer.freeze_CyclesDepleted', False),
+            ('TimedBuffer.isToBeFrozen', False),
+        ])
+
+    def test_0010_cache(self):
+        cache = CurrentCache()
+        self.instrumentation.addCache('current', cache)
+        buffer = qLPos(100)
+        cache.getCurrent(buffer, 100)
+        cache.getCurrent(buffer, 200)
+        stats = self.instrumentation.getStats()['caches']['current']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.instrumentation.reset()
+        stats = self.instrumentation.getStats()['caches']['current']
+        self.assertEqual((stats['hits'], stats['misses']), (0, 0))
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestInstrumentation))
+    return suite
@@ -0,0 +1,171 @@
+import random
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.schedule import ScheduledTimedBuffer
+
+
+def qPos(value, schedule=()):
+    return ScheduledTimedBuffer(schedule=schedule, delta=40, period=3600,
+        timestamp=0, delta_min=1, delta_factor=-1, value=value, full=28000)
+
+
+def getReplacedLimit(buffer, schedule):
+    """
+    The limit time of buffer with the schedule, found by replacing the
+    buffer at every start and looking for the last change in value.
+    """
+
+    if buffer.freeze:
+        return None
+    starts = dict((start, (delta, period))
+        for start, delta, period in schedule)
+    current = TimedBuffer.fromState(buffer.getState())
+    last = buffer.timestamp
+    value = buffer.value
+    for timestamp in range(buffer.timestamp + 1, max(starts) + 1):
+        state = current.getCurrent(timestamp)
+        if state.value != value:
+            last = timestamp
+            value = state.value
+        if timestamp in starts:
+            delta, period = starts[timestamp]
+            current = TimedBuffer(delta=delta, period=period,
+                timestamp=timestamp, delta_min=state.delta_min,
+                delta_factor=state.delta_factor, freeze=state.freeze,
+                full=state.full, value=state.value, empty=state.empty)
+    limit = current.getLimitTime()
+    if limit is None or limit == current.timestamp:
+        return last
+    return limit
+
+
+class TestScheduledTimedBuffer(TestCase):
+
+    def setUp(self):
+        # 40 an hour, then 30 an hour from 10 hours, then 20 every half
+        # hour from 20 hours.
+        self.pos = qPos(1234, [(36000, 30, 3600), (72000, 20, 1800)])
+
+    def tearDown(self):
+        pass
+
+    def test_0000_single_segment(self):
+        plain = TimedBuffer(delta=40, period=3600, timestamp=0,
+            delta_min=1, delta_factor=-1, value=1234, full=28000)
+        pos = qPos(1234)
+        self.assertEqual(pos.getSchedule(), ())
+        for timestamp in (0, 3600, 107999, 108000, 111600, 200000):
+            current = pos.getCurrent(timestamp)
+            self.assertTrue(isinstance(current, ScheduledTimedBuffer))
+            self.assertEqual(current.getState(),
+                plain.getCurrent(timestamp).getState())
+        for name in ('getDepletedTime', 'getRemainderTime', 'getLimitTime',
+                'getFreezeTime'):
+            self.assertEqual(getattr(pos, name)(), getattr(plain, name)())
+
+    def test_0010_segments(self):
+        self.assertEqual(self.pos.getCurrent(35999).value, 1234 - 360)
+        self.assertEqual(self.pos.getCurrent(36000).value, 1234 - 400)
+        self.assertEqual(self.pos.getCurrent(39599).value, 1234 - 400)
+        self.assertEqual(self.pos.getCurrent(39600).value, 1234 - 430)
+        self.assertEqual(self.pos.getCurrent(72000).value, 1234 - 700)
+        self.assertEqual(self.pos.getCurrent(73800).value, 1234 - 720)
+        current = self.pos.getCurrent(73800)
+        self.assertEqual(current.delta, 20)
+        self.assertEqual(current.period, 1800)
+        self.assertEqual(current.getSchedule(), ())
+
+    def test_0011_matches_replacement(self):
+        # same as replacing the buffer at every change.
+        first = TimedBuffer(delta=40, period=3600, timestamp=0, delta_min=1,
+            delta_factor=-1, value=1234, full=28000).getCurrent(36000)
+        second = TimedBuffer(delta=30, period=3600, timestamp=36000,
+            delta_min=1, delta_factor=-1, value=first.value,
+            full=28000).getCurrent(72000)
+        third = TimedBuffer(delta=20, period=1800, timestamp=72000,
+            delta_min=1, delta_factor=-1, value=second.value, full=28000)
+        for timestamp in (100000, 115199, 115200, 117000, 200000):
+            self.assertEqual(self.pos.getCurrent(timestamp).value,
+                third.getCurrent(timestamp).value)
+        self.assertEqual(self.pos.getLimitTime(), third.getLimitTime())
+        self.assertEqual(self.pos.getDepletedTime(),
+            third.getDepletedTime())
+
+    def test_0012_chained(self):
+        current = self.pos.getCurrent(50000)
+        self.assertEqual(current.getSchedule(), ((72000, 20, 1800),))
+        self.assertEqual(current.getCurrent(100000).value,
+            self.pos.getCurrent(100000).value)
+        self.assertEqual(current.getDepletedTime(),
+            self.pos.getDepletedTime())
+        # no time travel
+        self.assertEqual(current.getCurrent(0).value, current.value)
+
+    def test_0020_depleted_early(self):
+        pos = qPos(200, [(36000, 30, 3600), (72000, 20, 1800)])
+        self.assertEqual(pos.getLimitTime(), 18000)
+        self.assertEqual(pos.getDepletedTime(), 21600)
+        self.assertEqual(pos.getCurrent(100000).value, 0)
+        self.assertTrue(pos.getCurrent(100000).freeze)
+
+    def test_0021_limit_before_change(self):
+        # reaches empty in the first segment, but only depleted after
+        # the change.
+        pos = qPos(400, [(38000, 30, 3600)])
+        self.assertEqual(pos.getLimitTime(), 36000)
+        self.assertEqual(pos.getDepletedTime(), 41600)
+
+    def test_0022_limit_settled(self):
+        # settles at the start of the last segment, without any change
+        # in value before it.
+        buffer = ScheduledTimedBuffer(schedule=[(19, 27, 25)], delta=7,
+            period=22, timestamp=0, full=130, value=117, delta_min=1)
+        self.assertEqual(buffer.getLimitTime(), 0)
+        self.assertEqual(buffer.getCurrent(100000).value, 117)
+        # the last change is the last cycle before the last segment.
+        buffer = ScheduledTimedBuffer(schedule=[(203, 38, 25)], delta=2,
+            period=2, timestamp=0, full=300, value=230, delta_min=1,
+            delta_factor=-1)
+        self.assertEqual(buffer.getLimitTime(), 202)
+        self.assertEqual(buffer.getCurrent(201).value, 30)
+        self.assertEqual(buffer.getCurrent(202).value, 28)
+        self.assertEqual(buffer.getCurrent(100000).value, 28)
+
+    def test_0023_limit_replacement(self):
+        rng = random.Random(0)
+        for i in range(1000):
+            schedule = [(start, rng.randint(1, 40), rng.randint(1, 30))
+                for start in sorted(rng.sample(range(1, 300),
+                    rng.randint(1, 3)))]
+            full = rng.randint(50, 300)
+            kw = dict(delta=rng.randint(1, 40), period=rng.randint(1, 30),
+                timestamp=0, full=full, value=rng.randint(0, full),
+                delta_min=rng.choice([0, 0.5, 1]),
+                delta_factor=rng.choice([1, -1]))
+            buffer = ScheduledTimedBuffer(schedule=schedule, **kw)
+            self.assertEqual(buffer.getLimitTime(),
+                getReplacedLimit(buffer, schedule), (schedule, kw))
+
+    def test_0030_freeze(self):
+        frozen = self.pos.getCurrent(50000, True)
+        self.assertTrue(frozen.freeze)
+        self.assertEqual(frozen.getCurrent(100000).value, frozen.value)
+        self.assertEqual(frozen.getDepletedTime(), None)
+
+    def test_0040_samples(self):
+        timestamps = range(0, 200000, 900)
+        samples = list(self.pos.iterSamples(timestamps))
+        self.assertEqual(samples, [(t, self.pos.getCurrent(t).value,
+            self.pos.getCurrent(t).freeze) for t in timestamps])
+        breakpoints = list(self.pos.iterSamples(timestamps, True))
+        self.assertEqual(breakpoints[:3], [(0, 1234, False),
+            (3600, 1194, False), (7200, 1154, False)])
+        self.assertEqual(len(breakpoints),
+            len(set((v, f) for t, v, f in samples)))
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestScheduledTimedBuffer))
+    return suite
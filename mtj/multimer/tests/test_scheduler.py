@@ -0,0 +1,108 @@
+import random
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.scheduler import HeapScheduler, WheelScheduler
+from mtj.multimer.scheduler import getScheduler
+
+
+class TestHeapScheduler(TestCase):
+
+    def makeScheduler(self):
+        return HeapScheduler()
+
+    def setUp(self):
+        self.scheduler = self.makeScheduler()
+
+    def tearDown(self):
+        pass
+
+    def test_0000_base(self):
+        self.assertEqual(self.scheduler.peek(), None)
+        self.assertEqual(self.scheduler.popDue(1000), [])
+        self.scheduler.push('a', 3600, 'cycle')
+        self.scheduler.push('b', 60)
+        self.scheduler.push('c', 60)
+        self.assertEqual(len(self.scheduler), 3)
+        self.assertTrue('a' in self.scheduler)
+        self.assertEqual(self.scheduler.peek(), (60, 'b', None))
+        self.assertEqual(self.scheduler.popDue(59), [])
+        self.assertEqual(self.scheduler.popDue(60),
+            [(60, 'b', None), (60, 'c', None)])
+        self.assertEqual(self.scheduler.peek(), (3600, 'a', 'cycle'))
+        self.assertEqual(self.scheduler.popDue(10 ** 12),
+            [(3600, 'a', 'cycle')])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_0001_cancel_reschedule(self):
+        self.scheduler.push('a', 100)
+        self.scheduler.push('b', 200)
+        self.scheduler.cancel('a')
+        self.scheduler.cancel('nothing')
+        self.assertEqual(self.scheduler.peek(), (200, 'b', None))
+        self.scheduler.push('b', 50)
+        self.assertEqual(self.scheduler.popDue(1000), [(50, 'b', None)])
+
+    def test_0002_past(self):
+        self.scheduler.push('a', 1000)
+        self.assertEqual(self.scheduler.popDue(500), [])
+        self.scheduler.push('b', 10)
+        self.scheduler.push('c', 700)
+        self.assertEqual(self.scheduler.popDue(600), [(10, 'b', None)])
+        self.assertEqual(self.scheduler.popDue(1000),
+            [(700, 'c', None), (1000, 'a', None)])
+
+    def test_0100_random(self):
+        rng = random.Random(20121031)
+        reference = {}
+        now = 0
+        for step in range(2000):
+            action = rng.random()
+            key = rng.randrange(200)
+            if action < 0.6:
+                timestamp = now + rng.choice([1, 60, 3600, 86400,
+                    2 ** 40]) * rng.randrange(1, 100)
+                self.scheduler.push(key, timestamp)
+                reference[key] = timestamp
+            elif action < 0.7:
+                self.scheduler.cancel(key)
+                reference.pop(key, None)
+            else:
+                now += rng.randrange(0, 86400 * 2)
+                due = sorted(
+                    (t, k) for k, t in reference.items() if t <= now)
+                result = self.scheduler.popDue(now)
+                self.assertEqual(sorted((t, k) for t, k, kind in result),
+                    due)
+                self.assertEqual([t for t, k, kind in result],
+                    sorted(t for t, k in due))
+                for t, k in due:
+                    del reference[k]
+            self.assertEqual(len(self.scheduler), len(reference))
+            if reference:
+                self.assertEqual(self.scheduler.peek()[0],
+                    min(reference.values()))
+
+
+class TestWheelScheduler(TestHeapScheduler):
+
+    def makeScheduler(self):
+        return WheelScheduler(bits=4, levels=4)
+
+    def test_0200_start(self):
+        scheduler = WheelScheduler(start=0)
+        scheduler.push('a', 1)
+        scheduler.push('b', 0)
+        self.assertEqual(scheduler.popDue(1), [(0, 'b', None),
+            (1, 'a', None)])
+
+    def test_0201_get_scheduler(self):
+        self.assertTrue(isinstance(getScheduler('wheel'), WheelScheduler))
+        self.assertTrue(isinstance(getScheduler('heap'), HeapScheduler))
+        self.assertTrue(getScheduler(self.scheduler) is self.scheduler)
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestHeapScheduler))
+    suite.addTest(makeSuite(TestWheelScheduler))
+    return suite
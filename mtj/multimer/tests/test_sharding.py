@@ -0,0 +1,57 @@
+from functools import partial
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.sharding import ShardedEvaluator
+from mtj.multimer.sharding import getProjection, projectBuffers
+from mtj.multimer.tests import qLPos
+
+
+def getValue(buffer, timestamp):
+    return buffer.getCurrent(timestamp).value
+
+
+class TestShardedEvaluator(TestCase):
+
+    def setUp(self):
+        self.buffers = [qLPos(value) for value in range(0, 2000, 7)]
+        self.expected = [b.getCurrent(36000).value for b in self.buffers]
+        self.func = partial(getValue, timestamp=36000)
+
+    def tearDown(self):
+        pass
+
+    def test_0000_serial(self):
+        evaluator = ShardedEvaluator(workers=0, chunksize=10)
+        self.assertEqual(evaluator.map(self.func, self.buffers),
+            self.expected)
+        self.assertEqual(evaluator.map(self.func, []), [])
+
+    def test_0001_states(self):
+        evaluator = ShardedEvaluator(workers=0)
+        self.assertEqual(evaluator.mapStates(self.func,
+            [b.getState() for b in self.buffers]), self.expected)
+
+    def test_0010_processes(self):
+        evaluator = ShardedEvaluator(workers=2, chunksize=16, threshold=0)
+        self.assertEqual(evaluator.map(self.func, self.buffers),
+            self.expected)
+
+    def test_0020_projection(self):
+        timestamps = range(0, 86400 * 30, 3600)
+        projection = getProjection(qLPos(100), timestamps)
+        self.assertEqual(projection['depleted'], 10800)
+        self.assertEqual(projection['limit'], 7200)
+        self.assertEqual(projection['samples'], [
+            (0, 100, False),
+            (3600, 60, False),
+            (7200, 20, False),
+            (10800, 20, True),
+        ])
+        self.assertEqual(projectBuffers([qLPos(100)], 0, 86400 * 30, 3600,
+            workers=0), [projection])
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestShardedEvaluator))
+    return suite
@@ -0,0 +1,119 @@
+from unittest import TestCase, TestSuite, makeSuite, skipIf
+import multiprocessing
+import subprocess
+import sys
+
+try:
+    from mtj.multimer.shared import SharedBufferTable, SharedBufferView
+except (ImportError, SyntaxError):  # pragma: no cover
+    SharedBufferTable = None
+
+from mtj.multimer.tests import qLPos, qSilo
+
+
+def readValues(name, timestamp):
+    with SharedBufferView(name) as view:
+        return view.getValues(timestamp).tolist()
+
+
+@skipIf(SharedBufferTable is None, 'requires Python 3.8 and numpy')
+class TestSharedBufferTable(TestCase):
+
+    def setUp(self):
+        self.table = SharedBufferTable(4, keysize=8)
+        self.table.updateMany([
+            ('silo', qSilo(1234, 60000)),
+            ('pos', qLPos(1234)),
+        ])
+        self.view = SharedBufferView(self.table.name)
+
+    def tearDown(self):
+        self.view.close()
+        self.table.close()
+        self.table.unlink()
+
+    def test_0000_base(self):
+        self.assertEqual(len(self.view), 2)
+        self.assertEqual(self.view.keys(), ['silo', 'pos'])
+        self.assertTrue('pos' in self.view)
+        self.assertFalse('nope' in self.view)
+        self.assertEqual(self.view['pos'].getState(),
+            qLPos(1234).getState())
+        self.assertEqual(self.table['pos'].getState(),
+            qLPos(1234).getState())
+        self.assertRaises(KeyError, self.view.__getitem__, 'nope')
+
+    def test_0001_evaluate(self):
+        self.assertEqual(self.view.getValues(7200).tolist(), [1434, 1154])
+        self.assertEqual(self.view.getCurrent('pos', 7200).value, 1154)
+        self.assertEqual(self.view.evaluate('getDepletedTime').tolist(),
+            [qSilo(1234, 60000).getDepletedTime(),
+                qLPos(1234).getDepletedTime()])
+        current = self.view.evaluate('getCurrent', 7200)
+        self.table.update('pos', qLPos(0))
+        self.assertEqual(current.value.tolist(), [1434, 1154])
+        self.assertEqual(current.full.tolist(), [60000, 28000])
+
+    def test_0002_update_remove(self):
+        self.table.update('pos', qLPos(1000))
+        self.assertEqual(self.view['pos'].value, 1000)
+        self.table.update('tower', qLPos(10))
+        self.assertEqual(self.view.keys(), ['silo', 'pos', 'tower'])
+        self.table.remove('silo')
+        self.assertEqual(self.view.keys(), ['tower', 'pos'])
+        self.assertEqual(self.view['tower'].value, 10)
+        self.table.remove('pos')
+        self.assertEqual(self.view.keys(), ['tower'])
+        self.assertRaises(KeyError, self.table.remove, 'pos')
+
+    def test_0003_limits(self):
+        self.assertRaises(ValueError, self.table.update, 'too long!',
+            qLPos(1))
+        self.table.updateMany([('a', qLPos(1)), ('b', qLPos(1))])
+        self.assertRaises(ValueError, self.table.update, 'c', qLPos(1))
+        self.assertEqual(len(self.view), 4)
+
+    def test_0004_process(self):
+        pool = multiprocessing.Pool(1)
+        try:
+            self.assertEqual(pool.apply(readValues, (self.table.name, 7200)),
+                [1434, 1154])
+        finally:
+            pool.close()
+            pool.join()
+
+    def test_0005_subprocess(self):
+        # a reader with its own resource tracker must leave the table
+        # in place when it exits.
+        script = ('from mtj.multimer.shared import SharedBufferView\n'
+            'with SharedBufferView(%r) as view:\n'
+            '    print(view.getValues(7200).tolist())\n' % self.table.name)
+        for i in range(2):
+            output = subprocess.check_output([sys.executable, '-c', script])
+            self.assertEqual(output.strip(), b'[1434, 1154]')
+        self.assertEqual(self.view.getValues(7200).tolist(), [1434, 1154])
+
+    def test_0010_retry(self):
+        # a change made while reading causes the read to be repeated.
+        calls = []
+
+        def f(count, array):
+            calls.append(count)
+            if len(calls) == 1:
+                self.table.update('tower', qLPos(10))
+            return array.value.tolist()
+
+        self.assertEqual(self.view.read(f), [1234, 1234, 10])
+        self.assertEqual(calls, [2, 3])
+
+    def test_0011_read_error(self):
+        def f(count, array):
+            raise KeyError('nope')
+
+        self.assertRaises(KeyError, self.view.read, f)
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestSharedBufferTable))
+    return suite
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import TestCase, TestSuite, makeSuite, skipIf
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from mtj.multimer.buffer import Buffer, TimedBuffer
+from mtj.multimer.snapshot import SnapshotView, writeSnapshot
+from mtj.multimer.snapshot import packBuffer, unpackBuffer, record
+from mtj.multimer.tests.test_columnar import sample_buffers
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, 'snapshot')
+        self.buffers = sample_buffers()
+        with open(self.path, 'wb') as fd:
+            writeSnapshot(fd, self.buffers)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_0000_pack(self):
+        data = packBuffer(self.buffers[5])
+        self.assertEqual(len(data), record.size)
+        buff = unpackBuffer(data)
+        self.assertEqual(buff.getState(), self.buffers[5].getState())
+        self.assertTrue(isinstance(buff.value, int))
+        self.assertTrue(isinstance(buff.delta_min, float))
+
+        buff = unpackBuffer(packBuffer(Buffer(full=10, value=5)))
+        self.assertFalse(isinstance(buff, TimedBuffer))
+        self.assertEqual((buff.full, buff.value, buff.empty), (10, 5, 0))
+
+    def test_0010_view(self):
+        with SnapshotView(self.path) as view:
+            self.assertEqual(len(view), len(self.buffers))
+            self.assertEqual([b.getState() for b in view],
+                [b.getState() for b in self.buffers])
+            self.assertEqual(view[-1].getState(),
+                self.buffers[-1].getState())
+            self.assertRaises(IndexError, view.__getitem__, len(view))
+            self.assertEqual(view[3].getCurrent(108000).value, 34)
+
+    def test_0011_factory(self):
+
+        class Custom(TimedBuffer):
+            pass
+
+        with SnapshotView(self.path, factory=Custom) as view:
+            self.assertTrue(isinstance(view[0], Custom))
+
+    def test_0020_bad_files(self):
+        with open(self.path, 'wb') as fd:
+            fd.write(b'NOPE' + b'\0' * 20)
+        self.assertRaises(ValueError, SnapshotView, self.path)
+
+        # shorter than the header.
+        with open(self.path, 'wb') as fd:
+            fd.write(b'MTJB')
+        self.assertRaises(ValueError, SnapshotView, self.path)
+
+        stream = BytesIO()
+        writeSnapshot(stream, self.buffers)
+        with open(self.path, 'wb') as fd:
+            fd.write(stream.getvalue()[:-1])
+        self.assertRaises(ValueError, SnapshotView, self.path)
+
+    @skipIf(numpy is None, 'numpy is not available')
+    def test_0100_array(self):
+        view = SnapshotView(self.path)
+        array = view.toArray()
+        current = array.getCurrent(108000)
+        self.assertEqual(list(current.value),
+            [b.getCurrent(108000).value for b in self.buffers])
+        del array, current
+        view.close()
+
+    @skipIf(numpy is None, 'numpy is not available')
+    def test_0101_array_plain(self):
+        with open(self.path, 'wb') as fd:
+            writeSnapshot(fd, [Buffer()])
+        view = SnapshotView(self.path)
+        self.assertRaises(ValueError, view.toArray)
+        view.close()
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestSnapshot))
+    return suite
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.store import SQLiteStore
+from mtj.multimer.tests import qLPos, qSilo
+
+
+class TestSQLiteStore(TestCase):
+
+    def setUp(self):
+        self.store = SQLiteStore()
+        self.store.upsertMany([
+            ('silo', qSilo(1234, 60000)),
+            ('pos', qLPos(1234)),
+            ('frozen', TimedBuffer(timestamp=0, freeze=True)),
+        ])
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_0000_base(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertTrue('pos' in self.store)
+        self.assertFalse('nope' in self.store)
+        self.assertEqual(sorted(self.store.keys()),
+            ['frozen', 'pos', 'silo'])
+        self.assertEqual(self.store['pos'].getState(),
+            qLPos(1234).getState())
+        self.assertTrue(isinstance(self.store['silo'].value, int))
+        self.assertTrue(self.store['frozen'].freeze is True)
+        self.assertTrue(self.store['pos'].freeze is False)
+        self.assertRaises(KeyError, self.store.__getitem__, 'nope')
+
+    def test_0001_upsert_remove(self):
+        self.store.upsert('pos', qLPos(1234).getCurrent(7200))
+        self.assertEqual(self.store['pos'].value, 1154)
+        self.assertEqual(len(self.store), 3)
+        self.store.remove('pos')
+        self.assertFalse('pos' in self.store)
+        self.assertRaises(KeyError, self.store.remove, 'pos')
+
+    def test_0010_due(self):
+        self.store.upsert('later', qSilo(0, 60000).getCurrent(7200))
+        self.assertEqual([k for k, b in self.store.iterDue(3599)], [])
+        self.assertEqual([k for k, b in self.store.iterDue(3600)],
+            ['silo', 'pos'])
+        self.assertEqual([k for k, b in self.store.iterDue(20000)],
+            ['silo', 'pos', 'later'])
+
+    def test_0020_depleted(self):
+        self.assertEqual([k for k, b in self.store.iterDepleted()],
+            ['pos', 'silo'])
+        self.assertEqual([k for k, b in self.store.iterDepleted(0, 86400)],
+            [])
+        self.assertEqual(
+            [k for k, b in self.store.iterDepleted(end=86400 * 2)],
+            ['pos'])
+        self.assertEqual(
+            [k for k, b in self.store.iterDepleted(start=200000)],
+            ['silo'])
+
+    def test_0030_persistent(self):
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, 'store.db')
+            store = SQLiteStore(path)
+            store.upsertMany(('pos%d' % i, qLPos(i)) for i in range(1000))
+            store.close()
+            store = SQLiteStore(path)
+            self.assertEqual(len(store), 1000)
+            self.assertEqual(store['pos999'].value, 999)
+            plan = store.connection.execute('EXPLAIN QUERY PLAN '
+                'SELECT key FROM buffer WHERE depleted <= ?', (0,)
+                ).fetchall()
+            self.assertTrue('buffer_depleted' in str(plan))
+            store.close()
+        finally:
+            shutil.rmtree(tempdir)
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestSQLiteStore))
+    return suite
@@ -0,0 +1,103 @@
+from unittest import TestCase, TestSuite, makeSuite
+
+from mtj.multimer.buffer import TimedBuffer
+from mtj.multimer.tracker import Tracker, getNextEvent
+from mtj.multimer.tests import qLPos, qSilo
+
+
+class TestTracker(TestCase):
+
+    scheduler = 'heap'
+
+    def setUp(self):
+        self.tracker = Tracker(scheduler=self.scheduler)
+        self.tracker.add('silo', qSilo(59850, 60000))
+        self.tracker.add('pos', qLPos(100))
+        self.tracker.add('frozen', TimedBuffer(timestamp=0, freeze=True))
+
+    def tearDown(self):
+        pass
+
+    def test_0000_next_event(self):
+        self.assertEqual(getNextEvent(qSilo(59850, 60000)), (3600, 'cycle'))
+        self.assertEqual(getNextEvent(qSilo(59850, 60000), cycles=False),
+            (7200, 'depleted'))
+        self.assertEqual(getNextEvent(qSilo(60000, 60000)),
+            (3600, 'depleted'))
+        self.assertEqual(getNextEvent(TimedBuffer(freeze=True)), None)
+        # already past a few cycles.
+        buff = TimedBuffer(delta=1, period=60, timestamp=150, expiry=59,
+            full=100)
+        self.assertEqual(getNextEvent(buff), (180, 'cycle'))
+
+    def test_0001_mapping(self):
+        self.assertEqual(len(self.tracker), 3)
+        self.assertTrue('silo' in self.tracker)
+        self.assertEqual(self.tracker['pos'].value, 100)
+        self.assertEqual(self.tracker.getCurrent('pos', 3600).value, 60)
+        self.assertEqual(sorted(self.tracker.keys()),
+            ['frozen', 'pos', 'silo'])
+        self.assertRaises(KeyError, self.tracker.add, 'pos', qLPos(1))
+        self.assertRaises(KeyError, self.tracker.update, 'nope', qLPos(1))
+        self.assertRaises(KeyError, self.tracker.remove, 'nope')
+
+    def test_0010_peek_pop(self):
+        self.assertEqual(self.tracker.peekNext(), (3600, 'silo', 'cycle'))
+        self.assertEqual(self.tracker.popDue(3599), [])
+
+        events = self.tracker.popDue(3600)
+        self.assertEqual([(e.timestamp, e.key, e.kind) for e in events],
+            [(3600, 'silo', 'cycle'), (3600, 'pos', 'cycle')])
+        self.assertEqual(events[0].buffer.value, 59950)
+        self.assertEqual(self.tracker['silo'].value, 59950)
+        self.assertEqual(self.tracker['pos'].value, 60)
+
+        events = self.tracker.popDue(7200)
+        self.assertEqual([(e.timestamp, e.key, e.kind) for e in events],
+            [(7200, 'silo', 'depleted'), (7200, 'pos', 'cycle')])
+        self.assertEqual(self.tracker['silo'].value, 60000)
+        self.assertTrue(self.tracker['silo'].freeze)
+
+        self.assertEqual(self.tracker.peekNext(), (10800, 'pos', 'depleted'))
+
+    def test_0011_pop_skipped(self):
+        events = self.tracker.popDue(100000)
+        self.assertEqual([(e.timestamp, e.key, e.kind) for e in events],
+            [(3600, 'silo', 'depleted'), (3600, 'pos', 'depleted')])
+        self.assertEqual(self.tracker['pos'].value, 20)
+        self.assertEqual(self.tracker.peekNext(), None)
+
+    def test_0020_update_remove(self):
+        self.tracker.update('silo', qSilo(0, 60000).getCurrent(1800))
+        self.assertEqual(self.tracker.peekNext(), (3600, 'pos', 'cycle'))
+        self.tracker.remove('pos')
+        self.assertEqual(self.tracker.peekNext(), (3600, 'silo', 'cycle'))
+        self.assertEqual(len(self.tracker), 2)
+
+        for i in range(100):
+            self.tracker.update('silo', qSilo(i, 60000))
+        self.assertEqual(len(self.tracker.scheduler), 1)
+        self.assertEqual(self.tracker.peekNext(), (3600, 'silo', 'cycle'))
+
+    def test_0030_depletion_only(self):
+        tracker = Tracker(cycles=False, scheduler=self.scheduler)
+        tracker.add('silo', qSilo(59850, 60000))
+        tracker.add('pos', qLPos(100))
+        self.assertEqual(tracker.peekNext(), (7200, 'silo', 'depleted'))
+        self.assertEqual(tracker.popDue(7199), [])
+        events = tracker.popDue(7200)
+        self.assertEqual([(e.key, e.kind) for e in events],
+            [('silo', 'depleted')])
+        self.assertEqual(tracker.peekNext(), (10800, 'pos', 'depleted'))
+
+
+class TestWheelTracker(TestTracker):
+
+    scheduler = 'wheel'
+
+
+def test_suite():
+    suite = TestSuite()
+    suite.addTest(makeSuite(TestTracker))
+    suite.addTest(makeSuite(TestWheelTracker))
+    return suite
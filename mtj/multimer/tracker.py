@@ -0,0 +1,159 @@
+from collections import namedtuple
+
+from mtj.multimer.clock import now
+from mtj.multimer.scheduler import getScheduler
+
+
+Event = namedtuple('Event', ['timestamp', 'key', 'kind', 'buffer'])
+
+
+def getNextEvent(buffer, cycles=True):
+    """
+    Return the timestamp and kind of the next significant event for
+    the buffer, or None if nothing will happen to it.
+
+    The kind is either 'cycle' for the application of a delta, or
+    'depleted' for the point where the cycles are depleted and the
+    buffer becomes frozen.  If cycles is False, only depletion is
+    reported.
+    """
+
+    if buffer.freeze:
+        return None
+
+    cycles_available = buffer.getCyclesAvailable()
+    if cycles:
+        cycle = buffer.getCyclesElapsed(buffer.timestamp) + 1
+        if cycle <= cycles_available:
+            return buffer.getCycleTime(cycle), 'cycle'
+
+    return buffer.getDepletedTime(), 'depleted'
+
+
+def getEventKind(previous, current, timestamp):
+    """
+    Return the kind of event that took the previous state of a buffer
+    to its current state at timestamp.
+    """
+
+    if current.freeze and not previous.freeze:
+        if previous.isCyclesDepleted(timestamp):
+            return 'depleted'
+        return 'frozen'
+    return 'cycle'
+
+
+class Tracker(object):
+    """
+    Tracks a collection of named timed buffers, ordered by the time of
+    their next significant event.
+    """
+
+    def __init__(self, cycles=True, scheduler='heap', cache=None):
+        """
+        cycles - whether every cycle is an event, rather than only the
+                 depletion of the buffer.
+        scheduler - the name of the scheduler to order the events with,
+                    one of those in `mtj.multimer.scheduler.schedulers`,
+                    or a scheduler instance.  Default: heap
+        cache - a `mtj.multimer.cache.CurrentCache` for getCurrent.
+                Default: no caching.
+        """
+
+        self.cycles = cycles
+        self.scheduler = getScheduler(scheduler)
+        self.cache = cache
+
+        self._buffers = {}
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def __contains__(self, key):
+        return key in self._buffers
+
+    def __getitem__(self, key):
+        return self._buffers[key]
+
+    def keys(self):
+        return self._buffers.keys()
+
+    def _schedule(self, key, buffer):
+        event = getNextEvent(buffer, self.cycles)
+        if event is None:
+            self.scheduler.cancel(key)
+            return
+        timestamp, kind = event
+        self.scheduler.push(key, timestamp, kind)
+
+    def add(self, key, buffer):
+        """
+        Track a new buffer under key.
+        """
+
+        if key in self._buffers:
+            raise KeyError('%r is already tracked' % (key,))
+        self._buffers[key] = buffer
+        self._schedule(key, buffer)
+
+    def remove(self, key):
+        """
+        Stop tracking the buffer under key, and return it.
+        """
+
+        buffer = self._buffers.pop(key)
+        self.scheduler.cancel(key)
+        return buffer
+
+    def update(self, key, buffer):
+        """
+        Replace the buffer tracked under key.
+        """
+
+        if key not in self._buffers:
+            raise KeyError(key)
+        self._buffers[key] = buffer
+        self._schedule(key, buffer)
+
+    def getCurrent(self, key, timestamp=None):
+        """
+        Return the current state of the buffer tracked under key,
+        without advancing it.
+        """
+
+        buffer = self._buffers[key]
+        if self.cache is None:
+            return buffer.getCurrent(timestamp)
+        return self.cache.getCurrent(buffer, timestamp)
+
+    def peekNext(self):
+        """
+        Return the timestamp, key and kind of the next event as a
+        tuple, or None if there are no events scheduled.
+        """
+
+        return self.scheduler.peek()
+
+    def popDue(self, timestamp=None):
+        """
+        Advance every buffer with an event due at or before timestamp
+        to that timestamp, and return the events in the order they were
+        scheduled.  The timestamp of each event is the time it was
+        first due, while its buffer is the state at timestamp.
+
+        Timestamp defaults to current time unless it is specified.
+        """
+
+        if timestamp is None:
+            timestamp = now()
+
+        events = []
+        for due, key, kind in self.scheduler.popDue(timestamp):
+            previous = self._buffers[key]
+            buffer = previous.getCurrent(timestamp)
+            self._buffers[key] = buffer
+            self._schedule(key, buffer)
+            events.append(Event(due, key,
+                getEventKind(previous, buffer, timestamp), buffer))
+
+        return events
@@ -26,7 +26,12 @@ setup(name='mtj.multimer',
           'setuptools',
           # -*- Extra requirements: -*-
       ],
+      extras_require={
+          'numpy': ['numpy'],
+      },
       entry_points="""
       # -*- Entry points: -*-
+      [console_scripts]
+      mtj-multimer-benchmark = mtj.multimer.benchmark:main
       """,
       )